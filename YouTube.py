@@ -7,12 +7,33 @@ and saving the responses back to Excel cells and text files. It's specifically d
 YouTube content automation workflow.
 
 Features:
-- Reads content from Excel cells (C2, C3, C9, C10, C11, C12)
+- Reads content from Excel cells (C2, C3, C9, C10, C11, C12) in read-only streaming mode
 - Processes content through OpenRouter AI API using DeepSeek model
-- Saves responses to Excel cells (B4, B6, B9, B10) and text files
-- Uses temporary Word files for enhanced content processing (C11, C12)
-- Provides user confirmation prompts between steps
-- Automatic cleanup of temporary files
+- Reuses pooled keep-alive HTTP connections with timeouts and retry/backoff on 429/5xx
+- Per-model RPM/TPM token buckets with adaptive concurrency for the free model tier
+- Saves responses to Excel cells (B4, B6, B9, B10) in one atomic save, and to text files
+- Processes cell content in memory; --debug-intermediates dumps step inputs as text/Word files
+- Provides user confirmation prompts between steps, or a headless --yes / --parallel N mode
+- Batch mode (--batch) that processes every short of the sheet (the C2 … C12 layout repeated
+  every --block-rows rows) on a bounded worker pool
+- Optional streaming of the long text file responses straight into ShortEng_AT/ShortHindi_AT
+- On-disk LRU response cache so unchanged prompts are not sent to the API again
+- Lazy loading of heavy dependencies and .env for a fast start (--timing-imports, --check-config)
+- Streaming .docx text extraction; C11/C12 may hold the path of a Word file to use as input
+- Map-reduce processing of oversized C11/C12 content in concurrent, paragraph-aligned chunks
+- Optional bundling of the Excel cell steps into one JSON request, and deduplication of
+  identical in-flight requests
+- Fallback model chain (MODEL_FALLBACKS) with p95-based hedging of slow requests
+- Per-model circuit breaker and a per-run deadline (--deadline) split across the steps
+- Several workbooks/sheets processed in parallel worker processes (--workbooks) with a shared
+  response cache and split rate limits
+- Watch mode (--watch) that re-runs changed cells whenever the workbook is saved
+- SQLite results database (WAL mode, batched inserts) with the history of generated outputs;
+  --export-results writes the latest ones back to the Excel cells and text files
+- Write-ahead run journal; --resume replays finished steps and runs only the remaining ones
+- Incremental runs: unchanged inputs are skipped using a .state.json index next to the workbook
+- Opt-in cProfile/tracemalloc profiling of each step and helper (--profile DIR)
+- Per-step timing, token usage and retry metrics with JSON (--report) and Prometheus export
 
 Requirements:
 - Excel file: D:\\Anant\\Youtube\\ValueProITGyan\\YouTubeVideosList.xlsx
@@ -24,347 +45,3126 @@ Date: June 2025
 Version: 2.0 (Enhanced with complete Word file content processing)
 """
 
-import requests
+import argparse
+import functools
+import hashlib
+import importlib
 import json
+import math
 import os
-from dotenv import load_dotenv
-from openpyxl import load_workbook
-from docx import Document
+import queue
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 
-# Load environment variables from .env file
-load_dotenv()
+# Heavy dependencies (requests, openpyxl, python-docx with lxml) and the .env
+# file are loaded on first use, so runs that don't need them start faster
 
 # Configuration - Excel file path and sheet name
 EXCEL_FILE_PATH = r"D:\Anant\Youtube\ValueProITGyan\YouTubeVideosList.xlsx"
 SHEET_NAME = "Shorts_Automation"
+# Sheet whose state, journal, log and text files are named after the workbook
+# alone; files of other sheets also carry the sheet name
+DEFAULT_SHEET_NAME = SHEET_NAME
 
-def get_ai_response(prompt, model="deepseek/deepseek-chat:free"):
+# Configuration - OpenRouter API endpoint and default model
+API_URL = "https://openrouter.ai/api/v1/chat/completions"
+DEFAULT_MODEL = "deepseek/deepseek-chat:free"
+
+# WordprocessingML namespace of the elements in word/document.xml
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Markup compatibility namespace (mc:AlternateContent, mc:Fallback)
+MC_NAMESPACE = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+# Tunable settings; each one can be overridden by an environment variable
+# (or .env entry) with the same name
+DEFAULT_SETTINGS = {
+    'API_CONNECT_TIMEOUT': 10.0,   # Seconds allowed to open the connection
+    'API_READ_TIMEOUT': 120.0,     # Seconds allowed between bytes of the response
+    'API_MAX_RETRIES': 4,          # Retries on HTTP 429/5xx and connection errors
+    'API_BACKOFF_BASE': 1.0,       # First retry delay in seconds (doubles each retry)
+    'API_BACKOFF_MAX': 60.0,       # Upper bound for a single retry delay
+    'API_POOL_SIZE': 10,           # Keep-alive connections kept open per host
+    'API_RPM': 20,                 # Requests per minute per model (0 = unlimited)
+    'API_TPM': 0,                  # Estimated prompt tokens per minute per model (0 = unlimited)
+    'MODEL_RATE_LIMITS': '',       # JSON per-model budgets, e.g. {"model": {"rpm": 20, "tpm": 0}}
+    'API_MAX_CONCURRENCY': 8,      # Upper bound for concurrent requests per model
+    'RATE_LIMIT_SHARE': 1.0,       # Fraction of the RPM/TPM budgets this process may use
+    'BREAKER_FAILURES': 5,         # Consecutive failed requests that open a model's circuit (0 = off)
+    'BREAKER_RESET': 30.0,         # Seconds an open circuit fails fast before a probe request
+    'RUN_DEADLINE': 0.0,           # Seconds allowed for a whole run, split across its steps (0 = none)
+    'MODEL_FALLBACKS': '',         # Models tried after the primary one, comma-separated
+    'HEDGE_REQUESTS': True,        # Also ask the next model when the current one is slow
+    'HEDGE_PERCENTILE': 95.0,      # Hedge after this percentile of the model's recent latencies
+    'HEDGE_MIN_SAMPLES': 5,        # Latencies measured before the percentile is used
+    'HEDGE_DEFAULT_DELAY': 30.0,   # Hedge delay in seconds until then
+    'CACHE_ENABLED': True,         # Serve repeated prompts from the response cache
+    'CACHE_REFRESH': False,        # Ignore cached responses but store new ones
+    'CACHE_DIR': '',               # Cache directory (default: .ai_cache next to the Excel file)
+    'CACHE_MAX_ENTRIES': 1000,     # Least recently used entries are evicted above this
+    'CACHE_MAX_MB': 50.0,          # ... or above this total size
+    'CACHE_MAX_AGE_DAYS': 30.0,    # Entries older than this are ignored and removed (0 = never)
+    'API_STREAM': False,           # Stream text file responses token by token (server-sent events)
+    'CHUNK_MAX_TOKENS': 6000,      # Text file content above this estimate is processed with map-reduce
+    'CHUNK_WORKERS': 4,            # Chunks processed at the same time
+    'BUNDLE_CELL_STEPS': False,    # Send the Excel cell steps as one structured JSON request
+    'INCREMENTAL': True,           # Skip steps whose input is unchanged since the last run
+    'RUN_JOURNAL': True,           # Record step states in a .journal.jsonl file for --resume
+    'RESULTS_DB': True,            # Keep every generated output in a SQLite results database
+    'RESULTS_DB_PATH': '',         # Database path (default: <workbook>.results.sqlite next to it)
+    'RESULTS_BATCH_SIZE': 100,     # Outputs inserted per transaction
+    'WATCH_INTERVAL': 1.0,         # Seconds between checks of the Excel file in --watch mode
+    'WATCH_DEBOUNCE': 2.0,         # Seconds the file must stay unchanged before a --watch run
+    'DEBUG_INTERMEDIATES': False,  # Keep temp_<cell>.txt/.docx dumps of each step's input
+}
+
+# Workflow steps: source cell → target Excel cell ('excel') or text file ('text')
+WORKFLOW_STEPS = [
+    {'number': 1, 'source': 'C2', 'target': 'B4', 'kind': 'excel'},
+    {'number': 2, 'source': 'C3', 'target': 'B6', 'kind': 'excel'},
+    {'number': 3, 'source': 'C9', 'target': 'B9', 'kind': 'excel'},
+    {'number': 4, 'source': 'C10', 'target': 'B10', 'kind': 'excel'},
+    {'number': 5, 'source': 'C11', 'target': 'ShortEng_AT', 'kind': 'text', 'language': 'English'},
+    {'number': 6, 'source': 'C12', 'target': 'ShortHindi_AT', 'kind': 'text', 'language': 'Hindi'},
+]
+
+# Prompt templates for Excel cell steps and text file (Word content) steps
+CELL_PROMPT_TEMPLATE = "Based on this content from the temporary file: '{content}', generate an appropriate response for cell {target}."
+TEXT_PROMPT_TEMPLATE = """COMPLETE CONTENT from Word file (preserving all formatting and newlines):
+
+{content}
+
+Based on the COMPLETE content above from the temporary Word file, generate an appropriate {language} short response for {target} file. Please process the entire content including all lines, paragraphs, and formatting."""
+
+# Step result for inputs that did not change since the last run (incremental mode)
+STEP_UNCHANGED = 'unchanged'
+# Step result for outputs replayed from the run journal (--resume)
+STEP_REPLAYED = 'replayed'
+
+# Map-reduce prompts for text file content larger than CHUNK_MAX_TOKENS:
+# each chunk is condensed first, then one call writes the response from the notes
+CHUNK_MAP_PROMPT_TEMPLATE = """This is part {index} of {count} of a long document from a Word file (preserving all formatting and newlines):
+
+{content}
+
+Extract all the key points, facts and structure of this part as concise notes. They will be combined with the notes of the other parts to generate an appropriate {language} short response for {target} file."""
+CHUNK_REDUCE_PROMPT_TEMPLATE = """COMPLETE CONTENT from Word file, condensed into notes from {count} consecutive parts:
+
+{content}
+
+Based on the COMPLETE content represented by the notes above, generate an appropriate {language} short response for {target} file. Please cover the entire content of all parts."""
+
+# Prompt for bundling several Excel cell steps into one request (--bundle)
+BUNDLE_PROMPT_TEMPLATE = """Answer each of the following requests for the Excel cells {targets}.
+
+{prompts}
+
+Reply with only a JSON object that maps each cell reference to its response text, for example {{"B4": "..."}}. Do not add any other text."""
+
+# HTTP status codes that are worth retrying (rate limited / server side errors)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Third-party modules imported lazily, reported by --timing-imports
+HEAVY_MODULES = ('dotenv', 'requests', 'openpyxl', 'docx')
+
+# Settings changed at runtime (e.g. from command line options) by set_setting()
+_setting_overrides = {}
+
+# Seconds between checks of a hedged request's cancel event while it waits
+# for the rate limiter
+CANCEL_POLL_INTERVAL = 0.5
+
+# Per-model rate limiter state (token buckets and adaptive concurrency),
+# guarded by _rate_limit_condition
+_rate_limiters = {}
+_rate_limit_condition = threading.Condition()
+
+# Durations of the last LATENCY_HISTORY_SIZE successful requests per model,
+# used for the hedge delay; guarded by _latency_lock
+LATENCY_HISTORY_SIZE = 100
+_model_latencies = {}
+_latency_lock = threading.Lock()
+
+# Circuit breaker per model (closed / open / half-open), guarded by _breaker_lock
+_circuit_breakers = {}
+_breaker_lock = threading.Lock()
+
+# Deadline of the current run and the steps it is still split across, guarded
+# by _deadline_lock; _deadline_local holds the deadline of each thread's step
+_run_deadline = {'ends': None, 'pending': None, 'concurrency': 1}
+_deadline_lock = threading.Lock()
+_deadline_local = threading.local()
+
+# Response cache counters for this process, guarded by _cache_lock
+_cache_stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+_cache_lock = threading.Lock()
+
+# Per-step durations, phase timings and counters of the current run, guarded
+# by _metrics_lock; _metrics_local holds the step running in each thread
+_run_metrics = {'started': time.time(), 'steps': {}}
+_metrics_lock = threading.Lock()
+_metrics_local = threading.local()
+
+# Incremental run state: source cell → input hash and output of the last
+# successful run, loaded lazily from the sidecar file; guarded by _state_lock
+_state_index = {'entries': {}, 'loaded_from': None, 'dirty': False}
+_state_lock = threading.Lock()
+
+# Write-ahead run journal: open file, last recorded state per step and
+# whether the run resumes an interrupted one; guarded by _journal_lock
+_journal = {'file': None, 'states': {}, 'resume': False}
+_journal_lock = threading.Lock()
+
+# Whether the .env file has been loaded by load_environment()
+_environment_loaded = False
+_environment_lock = threading.Lock()
+
+# Requests currently being sent, keyed by (cache key, stream path); identical
+# requests wait for the first one's Future; guarded by _inflight_lock
+_inflight_requests = {}
+_inflight_lock = threading.Lock()
+
+# Shared HTTP session, created on first use by get_http_session()
+_http_session = None
+_http_session_lock = threading.Lock()
+
+# Parsed cell values per (file, sheet, cells), reused by read_cells() while
+# the file fingerprint (mtime, size) is unchanged; guarded by _snapshot_lock
+_workbook_snapshots = {}
+_snapshot_lock = threading.Lock()
+
+# Generated outputs waiting for flush_results(), guarded by _results_lock
+_pending_results = []
+_results_lock = threading.Lock()
+
+# Profiling for --profile: output folder (None = disabled), cProfile stats and
+# summary per step/helper and the number of profiled blocks running, guarded by
+# _profile_lock; _profile_local marks threads whose cProfile profiler is running
+_profiling = {'dir': None, 'stats': {}, 'summary': {}, 'active': 0}
+_profile_lock = threading.Lock()
+_profile_local = threading.local()
+
+# Excel cell updates waiting for flush_excel_writes(), guarded by _excel_lock
+_pending_excel_writes = {}
+_excel_lock = threading.Lock()
+
+# Fingerprints of the Excel file around our own saves, also guarded by
+# _excel_lock: the file as first loaded and as last saved by
+# flush_excel_writes(), and whether another program saved it in between
+_excel_saves = {'first_loaded': None, 'last_saved': None, 'external': False}
+
+def load_environment():
+    """
+    Load environment variables from the .env file, once per process.
+    
+    Called on the first setting or API key lookup instead of at import time.
+    """
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    with _environment_lock:
+        if not _environment_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _environment_loaded = True
+
+def get_setting(name):
+    """
+    Get a tunable setting, preferring runtime overrides, then the environment,
+    then the built-in default.
+    
+    The value from the environment is converted to the type of the default value.
+    
+    Args:
+        name (str): Setting name (a key of DEFAULT_SETTINGS)
+    
+    Returns:
+        The configured value, or the default if unset or invalid
+    """
+    if name in _setting_overrides:
+        return _setting_overrides[name]
+    load_environment()
+    default = DEFAULT_SETTINGS[name]
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value.strip() == '':
+        return default
+    try:
+        if isinstance(default, bool):
+            return raw_value.strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+        return type(default)(raw_value)
+    except ValueError:
+        print(f"⚠️ Invalid value for {name}: {raw_value!r}, using default {default}")
+        return default
+
+def set_setting(name, value):
+    """
+    Override a tunable setting for the rest of the process.
+    
+    Args:
+        name (str): Setting name (a key of DEFAULT_SETTINGS)
+        value: New value
+    """
+    if name not in DEFAULT_SETTINGS:
+        raise KeyError(f"Unknown setting: {name}")
+    _setting_overrides[name] = value
+
+@contextmanager
+def profile_block(name):
+    """
+    Profile the enclosed block with cProfile and tracemalloc while --profile is enabled.
+    
+    Only the outermost block of a thread runs a cProfile profiler, so a
+    step's pstats include the helpers it calls; nested blocks still record
+    their calls, time and allocation peak for the summary. When profiling is
+    disabled the block only costs one dictionary lookup.
+    
+    Args:
+        name (str): Step or helper name (pstats file name and summary row)
+    """
+    if _profiling['dir'] is None:
+        yield
+        return
+    import cProfile
+    import tracemalloc
+    profiler = None
+    if not getattr(_profile_local, 'active', False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            _profile_local.active = True
+        except ValueError:
+            profiler = None  # Another thread's profiler is active (one at a time since Python 3.12)
+    with _profile_lock:
+        if not _profiling['active']:
+            tracemalloc.reset_peak()
+        _profiling['active'] += 1
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - start_memory)
+        if profiler is not None:
+            profiler.disable()
+            _profile_local.active = False
+        _record_profile(name, elapsed, peak_bytes, profiler)
+
+def _record_profile(name, elapsed, peak_bytes, profiler):
+    """Add one profiled block to the summary and the aggregated pstats."""
+    import pstats
+    with _profile_lock:
+        _profiling['active'] -= 1
+        entry = _profiling['summary'].setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak_bytes': 0})
+        entry['calls'] += 1
+        entry['seconds'] += elapsed
+        entry['peak_bytes'] = max(entry['peak_bytes'], peak_bytes)
+        if profiler is not None:
+            if name in _profiling['stats']:
+                _profiling['stats'][name].add(profiler)
+            else:
+                _profiling['stats'][name] = pstats.Stats(profiler)
+
+def profiled(func):
+    """
+    Decorator that profiles every call of a helper with profile_block().
+    
+    Args:
+        func (callable): Function to wrap
+    
+    Returns:
+        callable: Wrapped function
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _profiling['dir'] is None:
+            return func(*args, **kwargs)
+        with profile_block(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+def get_http_session():
+    """
+    Get the shared HTTP session used for all OpenRouter API calls.
+    
+    The session keeps connections alive between requests, so only the first
+    step of a run pays for the TCP/TLS handshake.
+    
+    Returns:
+        requests.Session: Shared session with a connection pool mounted
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            pool_size = get_setting('API_POOL_SIZE')
+            # Retries are handled by post_with_retries, not by urllib3
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value into a number of seconds.
+    
+    Args:
+        value (str): Header value, either delay-seconds or an HTTP date
+    
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def get_backoff_delay(attempt, retry_after=None):
+    """
+    Calculate how long to wait before the next retry.
+    
+    Uses exponential backoff with full jitter, unless the server asked for a
+    specific delay through Retry-After.
+    
+    Args:
+        attempt (int): Zero-based number of the attempt that just failed
+        retry_after (float): Delay requested by the server, if any
+    
+    Returns:
+        float: Delay in seconds
+    """
+    max_delay = get_setting('API_BACKOFF_MAX')
+    if retry_after is not None:
+        return min(retry_after, max_delay)
+    base_delay = get_setting('API_BACKOFF_BASE')
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+def estimate_tokens(text):
+    """
+    Roughly estimate the number of tokens in a text (about 4 characters per token).
+    
+    Args:
+        text (str): Text to measure
+    
+    Returns:
+        int: Estimated token count
+    """
+    return len(text) // 4 + 1
+
+def get_rate_limits(model):
+    """
+    Get the request and token budgets for a model.
+    
+    MODEL_RATE_LIMITS may hold a JSON object such as
+    {"deepseek/deepseek-chat:free": {"rpm": 20, "tpm": 0}}; models that are
+    not listed use API_RPM and API_TPM. A budget of 0 means unlimited.
+    Processes sharing the budgets (--workbooks) each get RATE_LIMIT_SHARE of them.
+    
+    Args:
+        model (str): Model name
+    
+    Returns:
+        tuple: (requests per minute, tokens per minute)
+    """
+    rpm, tpm = get_setting('API_RPM'), get_setting('API_TPM')
+    overrides = get_setting('MODEL_RATE_LIMITS')
+    if overrides:
+        try:
+            model_limits = json.loads(overrides).get(model, {})
+            rpm = model_limits.get('rpm', rpm)
+            tpm = model_limits.get('tpm', tpm)
+        except (ValueError, AttributeError):
+            print(f"⚠️ Invalid MODEL_RATE_LIMITS value, using API_RPM/API_TPM")
+    share = get_setting('RATE_LIMIT_SHARE')
+    return rpm * share, tpm * share
+
+def _get_rate_limiter(model):
+    """Get (or create) the rate limiter state of a model. Call with _rate_limit_condition held."""
+    limiter = _rate_limiters.get(model)
+    if limiter is None:
+        rpm, tpm = get_rate_limits(model)
+        if 0 < rpm < 1:
+            # A split budget (--workbooks) can drop below one request per minute;
+            # the bucket still has to hold the one token a request needs
+            print(f"⚠️ {model}: budget of {rpm:.2f} requests per minute in this process, "
+                  f"allowing one request every {60 / rpm:.0f}s")
+        limiter = {
+            'rpm': rpm,
+            'tpm': tpm,
+            'request_tokens': float(max(1, rpm)) if rpm else 0.0,  # Token bucket for requests (full at start)
+            'token_tokens': float(tpm),     # Token bucket for prompt tokens
+            'updated': time.monotonic(),
+            'blocked_until': 0.0,           # Set from Retry-After after a 429
+            'concurrency': get_setting('API_MAX_CONCURRENCY'),
+            'in_flight': 0,
+            'successes': 0,
+        }
+        _rate_limiters[model] = limiter
+    return limiter
+
+def _refill_rate_limiter(limiter, now):
+    """Refill a model's token buckets for the time elapsed since the last refill."""
+    elapsed = now - limiter['updated']
+    limiter['updated'] = now
+    if limiter['rpm']:
+        limiter['request_tokens'] = min(max(1, limiter['rpm']), limiter['request_tokens'] + elapsed * limiter['rpm'] / 60)
+    if limiter['tpm']:
+        limiter['token_tokens'] = min(limiter['tpm'], limiter['token_tokens'] + elapsed * limiter['tpm'] / 60)
+
+def acquire_api_slot(model, estimated_tokens, cancel_event=None):
+    """
+    Wait until a request to the model fits its rate budgets and concurrency limit.
+    
+    The wait ends early when the step deadline passes or the request is cancelled.
+    
+    Args:
+        model (str): Model name
+        estimated_tokens (int): Estimated prompt tokens of the request
+        cancel_event (threading.Event): Give up once this is set
+    
+    Returns:
+        bool: True if a slot was acquired, False if the deadline passed or
+        the request was cancelled
+    """
+    deadline = get_step_deadline()
+    with _rate_limit_condition:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            limiter = _get_rate_limiter(model)
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return False
+            _refill_rate_limiter(limiter, now)
+            # A single request larger than the whole budget only needs a full bucket
+            needed_tokens = min(estimated_tokens, limiter['tpm'])
+            
+            waits = []
+            if now < limiter['blocked_until']:
+                waits.append(limiter['blocked_until'] - now)
+            if limiter['in_flight'] >= limiter['concurrency']:
+                waits.append(None)  # Woken up by release_api_slot()
+            if limiter['rpm'] and limiter['request_tokens'] < 1:
+                waits.append((1 - limiter['request_tokens']) * 60 / limiter['rpm'])
+            if limiter['tpm'] and limiter['token_tokens'] < needed_tokens:
+                waits.append((needed_tokens - limiter['token_tokens']) * 60 / limiter['tpm'])
+            
+            if not waits:
+                if limiter['rpm']:
+                    limiter['request_tokens'] -= 1
+                if limiter['tpm']:
+                    limiter['token_tokens'] -= needed_tokens
+                limiter['in_flight'] += 1
+                return True
+            timed_waits = [wait for wait in waits if wait is not None]
+            wait = max(timed_waits) if timed_waits else None
+            if deadline is not None:
+                wait = min(wait, deadline - now) if wait is not None else deadline - now
+            if cancel_event is not None:
+                # The cancelling thread does not notify the condition
+                wait = min(wait, CANCEL_POLL_INTERVAL) if wait is not None else CANCEL_POLL_INTERVAL
+            _rate_limit_condition.wait(wait)
+
+def release_api_slot(model, throttled=False, retry_after=None):
+    """
+    Release a request slot and adapt the model's concurrency limit.
+    
+    The limit is halved when the API answers 429 and grows by one after a
+    full window of successful requests (additive increase, multiplicative
+    decrease), so parallel and batch runs settle just below the throttle point.
+    
+    Args:
+        model (str): Model name
+        throttled (bool): True if the API answered HTTP 429
+        retry_after (float): Delay requested by the server (Retry-After on a
+            429 or 5xx answer), if any; no request is sent to the model before it
+    """
+    with _rate_limit_condition:
+        limiter = _get_rate_limiter(model)
+        limiter['in_flight'] -= 1
+        if retry_after:
+            limiter['blocked_until'] = max(limiter['blocked_until'], time.monotonic() + retry_after)
+        if throttled:
+            limiter['successes'] = 0
+            if limiter['concurrency'] > 1:
+                limiter['concurrency'] = max(1, limiter['concurrency'] // 2)
+                print(f"🐢 Rate limited: {model} concurrency reduced to {limiter['concurrency']}")
+        else:
+            limiter['successes'] += 1
+            max_concurrency = get_setting('API_MAX_CONCURRENCY')
+            if limiter['successes'] >= limiter['concurrency'] and limiter['concurrency'] < max_concurrency:
+                limiter['concurrency'] += 1
+                limiter['successes'] = 0
+        _rate_limit_condition.notify_all()
+
+def post_with_retries(url, headers, payload, stream=False, cancel_event=None):
+    """
+    POST a JSON payload through the shared session, retrying transient failures.
+    
+    Connection errors, timeouts and HTTP 429/5xx responses are retried with
+    exponential backoff. Other responses are returned to the caller as-is.
+    Every attempt waits for a slot from the model's rate limiter first.
+    Rate limiter waits, timeouts and retry delays are capped by the step
+    deadline (--deadline).
+    
+    Args:
+        url (str): Request URL
+        headers (dict): Request headers
+        payload (dict): JSON request body
+        stream (bool): Return before the response body is downloaded
+        cancel_event (threading.Event): Stop retrying once this is set
+    
+    Returns:
+        requests.Response: Final response, or None if every attempt failed to
+        connect or the request was cancelled
+    """
+    import requests
+    session = get_http_session()
+    timeout = (get_setting('API_CONNECT_TIMEOUT'), get_setting('API_READ_TIMEOUT'))
+    max_retries = get_setting('API_MAX_RETRIES')
+    body = json.dumps(payload)
+    model = payload.get('model', DEFAULT_MODEL)
+    estimated_tokens = estimate_tokens(body)
+    
+    for attempt in range(max_retries + 1):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        # Timeouts never reach past the step deadline
+        time_left = get_time_left()
+        if time_left is not None:
+            if time_left <= 0:
+                print("⏰ Step deadline reached, giving up on the request")
+                return None
+            timeout = (min(get_setting('API_CONNECT_TIMEOUT'), time_left), min(get_setting('API_READ_TIMEOUT'), time_left))
+        retry_after = None
+        throttled = False
+        if not acquire_api_slot(model, estimated_tokens, cancel_event):
+            if cancel_event is None or not cancel_event.is_set():
+                print("⏰ Step deadline reached while waiting for the rate limiter")
+            return None
+        try:
+            response = session.post(url, headers=headers, data=body, timeout=timeout, stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == max_retries:
+                print(f"❌ Request failed after {attempt + 1} attempts: {e}")
+                return None
+            print(f"⚠️ Request error: {e}")
+        else:
+            # Retry-After is honoured for every retried status (e.g. 503);
+            # only 429 lowers the concurrency limit
+            throttled = response.status_code == 429
+            if response.status_code in RETRY_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                return response
+            print(f"⚠️ API returned HTTP {response.status_code}")
+            response.close()
+        finally:
+            release_api_slot(model, throttled, retry_after)
+        
+        record_metric(retries=1)
+        delay = get_backoff_delay(attempt, retry_after)
+        time_left = get_time_left()
+        if time_left is not None and delay >= time_left:
+            print(f"⏰ Step deadline reached, not retrying ({time_left:.1f}s left)")
+            return None
+        print(f"🔁 Retrying in {delay:.1f}s (attempt {attempt + 2} of {max_retries + 1})")
+        if cancel_event is not None:
+            cancel_event.wait(delay)
+        else:
+            time.sleep(delay)
+
+def get_model_chain(model=DEFAULT_MODEL):
+    """
+    Get the models tried for a request: the requested model followed by the
+    MODEL_FALLBACKS models (comma-separated), without duplicates.
+    
+    Args:
+        model (str): Primary model
+    
+    Returns:
+        list: Model names in the order they are tried
+    """
+    models = [model]
+    for fallback in get_setting('MODEL_FALLBACKS').split(','):
+        fallback = fallback.strip()
+        if fallback and fallback not in models:
+            models.append(fallback)
+    return models
+
+def record_latency(model, seconds):
+    """
+    Record the duration of a successful request to a model.
+    
+    Args:
+        model (str): Model name
+        seconds (float): Time from sending the request to the complete response
+    """
+    with _latency_lock:
+        _model_latencies.setdefault(model, deque(maxlen=LATENCY_HISTORY_SIZE)).append(seconds)
+
+def get_hedge_delay(model):
+    """
+    Get how long to wait for a model before hedging with the next one.
+    
+    The delay is the HEDGE_PERCENTILE (default p95) of the model's recent
+    successful request durations, or HEDGE_DEFAULT_DELAY until
+    HEDGE_MIN_SAMPLES requests have been measured.
+    
+    Args:
+        model (str): Model name
+    
+    Returns:
+        float: Delay in seconds
+    """
+    with _latency_lock:
+        samples = sorted(_model_latencies.get(model, ()))
+    if len(samples) < get_setting('HEDGE_MIN_SAMPLES'):
+        return get_setting('HEDGE_DEFAULT_DELAY')
+    rank = math.ceil(get_setting('HEDGE_PERCENTILE') / 100 * len(samples))
+    return samples[min(max(rank, 1), len(samples)) - 1]
+
+def _get_circuit_breaker(model):
+    """Get (or create) the circuit breaker state of a model. Call with _breaker_lock held."""
+    return _circuit_breakers.setdefault(model, {'state': 'closed', 'failures': 0, 'opened_at': 0.0, 'probing': False})
+
+def circuit_allows(model):
+    """
+    Check whether a request to a model may be sent.
+    
+    After BREAKER_FAILURES consecutive failed requests the model's circuit
+    opens and requests fail fast. Once BREAKER_RESET seconds have passed, a
+    single probe request is let through (half-open); its result closes or
+    re-opens the circuit.
+    
+    Args:
+        model (str): Model name
+    
+    Returns:
+        bool: True if the request may be sent
+    """
+    if not get_setting('BREAKER_FAILURES'):
+        return True
+    with _breaker_lock:
+        breaker = _get_circuit_breaker(model)
+        if breaker['state'] == 'closed':
+            return True
+        if breaker['probing'] or time.monotonic() - breaker['opened_at'] < get_setting('BREAKER_RESET'):
+            return False
+        breaker['state'], breaker['probing'] = 'half-open', True
+    print(f"🔌 Circuit half-open for {model}: sending a probe request")
+    return True
+
+def is_circuit_open(model):
+    """
+    Check whether requests to a model currently fail fast.
+    
+    Args:
+        model (str): Model name
+    
+    Returns:
+        bool: True if the model's circuit is open or half-open
+    """
+    with _breaker_lock:
+        return _get_circuit_breaker(model)['state'] != 'closed'
+
+def record_circuit_result(model, success):
+    """
+    Update a model's circuit breaker with the outcome of a request.
+    
+    Args:
+        model (str): Model name
+        success (bool): True if the request succeeded, False if it failed or
+            timed out, None if it was cancelled (only ends a probe)
+    """
+    if not get_setting('BREAKER_FAILURES'):
+        return
+    with _breaker_lock:
+        breaker = _get_circuit_breaker(model)
+        was_open = breaker['state'] != 'closed'
+        breaker['probing'] = False
+        if success is None:
+            return
+        if success:
+            breaker['state'], breaker['failures'] = 'closed', 0
+            if was_open:
+                print(f"🔌 Circuit closed for {model}: requests succeed again")
+            return
+        breaker['failures'] += 1
+        if breaker['state'] == 'half-open' or breaker['failures'] >= get_setting('BREAKER_FAILURES'):
+            breaker['state'], breaker['opened_at'] = 'open', time.monotonic()
+            record_metric(circuit_opened=1)
+            print(f"🔌 Circuit open for {model} after {breaker['failures']} failure(s): "
+                  f"failing fast for {get_setting('BREAKER_RESET'):.0f}s")
+
+def start_run_deadline(seconds, step_count=None, concurrency=1):
+    """
+    Start the deadline of a run (--deadline / RUN_DEADLINE).
+    
+    Args:
+        seconds (float): Time allowed for the whole run (0 = no deadline)
+        step_count (int): Steps the time is split across (None: unknown, each
+            step may use all the time left)
+        concurrency (int): Steps running at the same time
+    """
+    with _deadline_lock:
+        _run_deadline['ends'] = time.monotonic() + seconds if seconds > 0 else None
+        _run_deadline['pending'] = step_count
+        _run_deadline['concurrency'] = max(1, concurrency)
+
+def discount_step_deadlines(count):
+    """
+    Leave steps that do not take their own step_deadline() out of the split
+    of the run deadline (e.g. steps bundled into one request).
+    
+    Args:
+        count (int): Number of steps (negative to count them in again)
+    """
+    with _deadline_lock:
+        if _run_deadline['pending'] is not None:
+            _run_deadline['pending'] = max(0, _run_deadline['pending'] - count)
+
+def get_step_deadline():
+    """
+    Get the deadline of the step running in this thread.
+    
+    Returns:
+        float: time.monotonic() value, or None if there is no deadline
+    """
+    return getattr(_deadline_local, 'ends', None) or _run_deadline['ends']
+
+def get_time_left():
+    """
+    Get the time left before the current step's deadline.
+    
+    Returns:
+        float: Seconds (may be negative), or None if there is no deadline
+    """
+    ends = get_step_deadline()
+    return None if ends is None else ends - time.monotonic()
+
+@contextmanager
+def step_deadline(ends=None):
+    """
+    Apply a step deadline to API calls made by this thread in the enclosed block.
+    
+    Without `ends` the step gets its share of the run deadline: the time left
+    divided by the waves of steps that have not started yet, so time saved by
+    fast or skipped steps goes to the later ones. Helper threads of a step
+    pass the step's get_step_deadline() instead.
+    
+    Args:
+        ends (float): time.monotonic() deadline to apply
+    """
+    if ends is None:
+        with _deadline_lock:
+            ends = _run_deadline['ends']
+            pending = _run_deadline['pending']
+            if ends is not None and pending:
+                now = time.monotonic()
+                ends = now + max(0.0, ends - now) / math.ceil(pending / _run_deadline['concurrency'])
+                _run_deadline['pending'] = pending - 1
+    previous_ends = getattr(_deadline_local, 'ends', None)
+    _deadline_local.ends = ends
+    try:
+        yield
+    finally:
+        _deadline_local.ends = previous_ends
+
+def request_model(data, model, stream_path=None, cancel_event=None):
+    """
+    Send a request to one model through its circuit breaker and the step deadline.
+    
+    Args:
+        data (dict): Request body (the model is replaced)
+        model (str): Model name
+        stream_path (str): Stream the response into this file
+        cancel_event (threading.Event): Stop retrying once this is set
+    
+    Returns:
+        str: AI response content or None if the request failed or was not sent
+    """
+    time_left = get_time_left()
+    if time_left is not None and time_left <= 0:
+        print(f"⏰ Step deadline reached, not sending the request to {model}")
+        return None
+    if not circuit_allows(model):
+        record_metric(circuit_rejected=1)
+        print(f"🔌 Circuit open for {model}: failing fast")
+        return None
+    response = request_ai_response(dict(data, model=model), stream_path, cancel_event)
+    cancelled = cancel_event is not None and cancel_event.is_set()
+    record_circuit_result(model, None if cancelled else response is not None)
+    return response
+
+def request_model_chain(data, models, stream_path=None):
+    """
+    Send a request to a chain of models until one of them answers.
+    
+    A failed model, or one whose circuit breaker is open, falls through to
+    the next one straight away. Unless the response is
+    streamed into a file, a model that has not answered within its hedge
+    delay (see get_hedge_delay()) gets the same request sent to the next
+    model in parallel, and the first answer wins; the slower request is
+    cancelled before its next retry and its answer is discarded.
+    
+    Args:
+        data (dict): Request body for the first model
+        models (list): Models to try, from get_model_chain()
+        stream_path (str): Stream the response into this file (no hedging)
+    
+    Returns:
+        str: AI response content or None if every model failed
+    """
+    if stream_path or len(models) == 1 or not get_setting('HEDGE_REQUESTS'):
+        for index, model in enumerate(models):
+            if index:
+                record_metric(fallback_requests=1)
+                print(f"↪️ Falling back to {model}")
+            response = request_model(data, model, stream_path)
+            if response is not None:
+                return response
+        return None
+    
+    step_name, deadline = getattr(_metrics_local, 'step', 'run'), get_step_deadline()
+    answers = queue.Queue()
+    cancel_event = threading.Event()
+    
+    def send(model):
+        try:
+            with step_metrics(step_name, timed=False), step_deadline(deadline):
+                response = request_model(data, model, cancel_event=cancel_event)
+        except Exception as e:
+            print(f"❌ Request to {model} failed: {e}")
+            response = None
+        answers.put((model, response))
+    
+    def launch(model):
+        threading.Thread(target=send, args=(model,), daemon=True).start()
+    
+    launch(models[0])
+    started, pending = 1, 1
+    while pending:
+        hedge_delay = get_hedge_delay(models[started - 1]) if started < len(models) else None
+        try:
+            model, response = answers.get(timeout=hedge_delay)
+        except queue.Empty:
+            record_metric(hedged_requests=1)
+            print(f"⏱️ {models[started - 1]} has not answered after {hedge_delay:.1f}s, "
+                  f"also asking {models[started]}")
+            launch(models[started])
+            started, pending = started + 1, pending + 1
+            continue
+        pending -= 1
+        if response is not None:
+            cancel_event.set()
+            if model != models[0]:
+                print(f"🏁 Using the response from {model}")
+            return response
+        # A failed model is replaced at once, even while an earlier one is still running
+        if started < len(models):
+            record_metric(fallback_requests=1)
+            print(f"↪️ {model} failed, falling back to {models[started]}")
+            launch(models[started])
+            started, pending = started + 1, pending + 1
+    return None
+
+@profiled
+def get_ai_response(prompt, model=DEFAULT_MODEL, stream_path=None, validate=None):
+    """
+    Get AI response from OpenRouter API using the specified model.
+    
+    Responses are served from the on-disk response cache when the same
+    model, prompt and parameters were already answered, and identical
+    requests made at the same time are sent only once. Slow or failing
+    requests move on to the MODEL_FALLBACKS models (see request_model_chain()),
+    and a stale cached response is used while every model's circuit is open.
+    
+    Args:
+        prompt (str): The prompt to send to the AI model
+        model (str): The AI model to use (default: deepseek/deepseek-chat:free)
+        stream_path (str): If set and API_STREAM is enabled, stream the response,
+            printing tokens and writing them to this file as they arrive
+        validate (callable): If set, a response for which it returns False is
+            neither cached nor returned (and a cached one is removed)
+    
+    Returns:
+        str: AI response content or None if request fails
+    """
+    # Prepare request data
+    data = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    
+    models = get_model_chain(model)
+    # Answers from a fallback model are cached under the whole chain
+    cache_key = make_cache_key(data if len(models) == 1 else dict(data, fallbacks=models[1:]))
+    cached_response = cache_get(cache_key)
+    if cached_response is not None and validate and not validate(cached_response):
+        print(f"🗑️ Discarding unusable cached AI response ({cache_key[:12]})")
+        cache_delete(cache_key)
+        cached_response = None
+    if cached_response is not None:
+        record_metric(cache_hits=1)
+        print(f"⚡ Using cached AI response ({cache_key[:12]})")
+        if stream_path and get_setting('API_STREAM'):
+            print(cached_response)
+        return cached_response
+    
+    # Identical requests made at the same time share one API call
+    flight_key = (cache_key, stream_path)
+    with _inflight_lock:
+        flight = _inflight_requests.get(flight_key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _inflight_requests[flight_key] = Future()
+    if not is_leader:
+        record_metric(coalesced_requests=1)
+        print(f"🔗 Waiting for identical in-flight request ({cache_key[:12]})")
+        return flight.result()
+    
+    response = None
+    try:
+        record_metric(cache_misses=1, api_calls=1)
+        with timed_phase('network'):
+            if stream_path and get_setting('API_STREAM'):
+                response = request_model_chain(data, models, stream_path)
+            else:
+                response = request_model_chain(data, models)
+        if response is not None and validate and not validate(response):
+            response = None
+        elif response is not None:
+            cache_put(cache_key, data, response)
+        elif all(is_circuit_open(chain_model) for chain_model in models):
+            # The API is down: an old answer is better than none
+            response = cache_get(cache_key, allow_stale=True)
+            if response is not None and validate and not validate(response):
+                response = None
+            if response is not None:
+                record_metric(stale_cache_hits=1)
+                print(f"♻️ API unavailable, using a stale cached response ({cache_key[:12]})")
+    finally:
+        with _inflight_lock:
+            del _inflight_requests[flight_key]
+        flight.set_result(response)
+    return response
+
+def request_ai_response(data, stream_path=None, cancel_event=None):
+    """
+    Send a chat completion request to the OpenRouter API.
+    
+    The duration of successful requests is recorded for the hedge delay.
+    
+    Args:
+        data (dict): Request body (model, messages and any other parameters)
+        stream_path (str): If set, request a streamed (server-sent events)
+            response and write it to this file incrementally
+        cancel_event (threading.Event): Stop retrying once this is set
+    
+    Returns:
+        str: AI response content or None if request fails
+    """
+    load_environment()
+    api_key = os.getenv('OPENROUTER_API_KEY', 'your-api-key-here')
+    
+    # Check if API key is properly configured
+    if api_key == 'your-api-key-here':
+        print("❌ Error: API key not found. Check your .env file.")
+        return None
+    
+    # Set up headers for OpenRouter API
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://localhost",
+        "X-Title": "YouTube AI Chat",
+    }
+    
+    started = time.monotonic()
+    try:
+        # Make API request to OpenRouter (pooled connection, retries and timeouts)
+        if stream_path:
+            # Ask for the usage block, which OpenRouter sends in the last event
+            stream_data = dict(data, stream=True, usage={'include': True})
+            response = post_with_retries(API_URL, headers, stream_data, stream=True, cancel_event=cancel_event)
+        else:
+            response = post_with_retries(API_URL, headers, data, cancel_event=cancel_event)
+        if response is None:
+            return None
+        
+        # Process successful response
+        if response.status_code == 200 and stream_path:
+            content = read_streamed_response(response, stream_path)
+            if content is not None:
+                record_latency(data['model'], time.monotonic() - started)
+            return content
+        if response.status_code == 200:
+            result = response.json()
+            record_usage(result.get('usage'))
+            if 'choices' in result and len(result['choices']) > 0:
+                record_latency(data['model'], time.monotonic() - started)
+                return result['choices'][0]['message']['content']
+            else:
+                print("❌ No response content found in API response")
+                return None
+        else:
+            # Handle API errors
+            print(f"❌ API Error: HTTP {response.status_code}")
+            if response.status_code == 401:
+                print("🔑 Authentication Error: Invalid API key")
+            print("Response:", response.text)
+            return None
+            
+    except Exception as e:
+        print(f"❌ Request failed: {e}")
+        return None
+
+def record_usage(usage):
+    """
+    Record the token counts from an OpenRouter 'usage' block.
+    
+    Args:
+        usage (dict): Usage block of a response (may be None)
+    """
+    if usage:
+        record_metric(prompt_tokens=usage.get('prompt_tokens') or 0,
+                      completion_tokens=usage.get('completion_tokens') or 0)
+
+def read_streamed_response(response, output_path):
+    """
+    Read a streamed (server-sent events) chat completion.
+    
+    Each token is printed and appended to the output file as soon as it
+    arrives, so a dropped connection still leaves the partial output on disk.
+    
+    Args:
+        response (requests.Response): Response opened with stream=True
+        output_path (str): File that receives the tokens
+    
+    Returns:
+        str: Complete response content or None if the stream failed
+    """
+    import requests
+    parts = []
+    try:
+        with open(output_path, 'w', encoding='utf-8') as output_file:
+            for line in response.iter_lines():
+                # Blank lines separate events; lines starting with ':' are keep-alive comments
+                if not line or not line.startswith(b'data:'):
+                    continue
+                event_data = line[len(b'data:'):].strip()
+                if event_data == b'[DONE]':
+                    break
+                event = json.loads(event_data)
+                if 'error' in event:
+                    print(f"\n❌ API Error in stream: {event['error']}")
+                    return None
+                record_usage(event.get('usage'))
+                choices = event.get('choices') or []
+                token = choices[0].get('delta', {}).get('content') if choices else None
+                if token:
+                    parts.append(token)
+                    print(token, end='', flush=True)
+                    output_file.write(token)
+                    output_file.flush()
+    except (requests.RequestException, ValueError) as e:
+        print(f"\n❌ Stream interrupted: {e} (partial output kept in {os.path.basename(output_path)})")
+        return None
+    finally:
+        response.close()
+    print()
+    
+    if not parts:
+        print("❌ No response content found in API response")
+        return None
+    return ''.join(parts)
+
+def get_cache_dir():
+    """
+    Get the directory of the response cache (CACHE_DIR setting, or a
+    .ai_cache folder next to the Excel file).
+    
+    Returns:
+        str: Cache directory path
+    """
+    return get_setting('CACHE_DIR') or os.path.join(os.path.dirname(EXCEL_FILE_PATH), '.ai_cache')
+
+def make_cache_key(data):
+    """
+    Build the content-addressed cache key for a request.
+    
+    Args:
+        data (dict): Request body (model, messages and any other parameters)
+    
+    Returns:
+        str: SHA-256 hex digest of the canonical JSON request body
+    """
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def _count_cache_event(event):
+    """Increment one of the response cache counters."""
+    with _cache_lock:
+        _cache_stats[event] += 1
+
+def cache_get(key, allow_stale=False):
+    """
+    Look up a cached AI response.
+    
+    A hit refreshes the entry's modification time, which is what the LRU
+    eviction in evict_cache() orders by. Expired entries count as misses
+    but stay on disk until evict_cache() removes them.
+    
+    Args:
+        key (str): Cache key from make_cache_key()
+        allow_stale (bool): Also return expired entries, even with CACHE_REFRESH
+            (used while the API's circuit breaker is open)
+    
+    Returns:
+        str: Cached response, or None on a miss (or when reads are disabled)
+    """
+    if not get_setting('CACHE_ENABLED') or (get_setting('CACHE_REFRESH') and not allow_stale):
+        return None
+    filepath = os.path.join(get_cache_dir(), f"{key}.json")
+    try:
+        max_age = get_setting('CACHE_MAX_AGE_DAYS') * 86400
+        expired = max_age > 0 and time.time() - os.path.getmtime(filepath) > max_age
+        if expired and not allow_stale:
+            _count_cache_event('misses')
+            return None
+        with open(filepath, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        if not expired:
+            os.utime(filepath)
+    except (OSError, ValueError):
+        _count_cache_event('misses')
+        return None
+    _count_cache_event('hits')
+    return entry['response']
+
+def cache_put(key, data, response):
+    """
+    Store an AI response in the cache and evict old entries.
+    
+    The entry is written to a temporary file and renamed into place, so a
+    concurrent reader never sees a partially written entry.
+    
+    Args:
+        key (str): Cache key from make_cache_key()
+        data (dict): Request body the response belongs to
+        response (str): AI response content
+    """
+    if not get_setting('CACHE_ENABLED'):
+        return
+    cache_dir = get_cache_dir()
+    entry = {'model': data.get('model'), 'created': time.time(), 'response': response}
+    temp_filepath = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_filepath = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_filepath, os.path.join(cache_dir, f"{key}.json"))
+        _count_cache_event('writes')
+        evict_cache()
+    except OSError as e:
+        print(f"⚠️ Could not write response cache: {e}")
+        if temp_filepath and os.path.exists(temp_filepath):
+            os.remove(temp_filepath)
+
+def cache_delete(key):
+    """
+    Remove an entry from the response cache, if present.
+    
+    Args:
+        key (str): Cache key from make_cache_key()
+    """
+    try:
+        os.remove(os.path.join(get_cache_dir(), f"{key}.json"))
+    except OSError:
+        pass
+
+def evict_cache():
+    """
+    Remove expired cache entries, then the least recently used ones until the
+    cache fits within CACHE_MAX_ENTRIES and CACHE_MAX_MB.
+    """
+    cache_dir = get_cache_dir()
+    max_age = get_setting('CACHE_MAX_AGE_DAYS') * 86400
+    max_entries = get_setting('CACHE_MAX_ENTRIES')
+    max_bytes = get_setting('CACHE_MAX_MB') * 1024 * 1024
+    now = time.time()
+    
+    with _cache_lock:
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        # Oldest (least recently used) entries first
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        remaining = len(entries)
+        for mtime, size, path in entries:
+            expired = max_age > 0 and now - mtime > max_age
+            if not expired and remaining <= max_entries and total_bytes <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            remaining -= 1
+            total_bytes -= size
+            _cache_stats['evictions'] += 1
+
+def reset_metrics():
+    """Start a new run: clear all recorded step metrics."""
+    with _metrics_lock:
+        _run_metrics['started'] = time.time()
+        _run_metrics['steps'].clear()
+
+def _get_step_metrics(step_name):
+    """Get (or create) the metrics record of a step. Call with _metrics_lock held."""
+    return _run_metrics['steps'].setdefault(step_name, {'duration': 0.0, 'phases': {}, 'counters': {}})
+
+def record_metric(phase=None, seconds=0.0, **counters):
+    """
+    Record a phase duration and/or counters for the step running in this thread.
+    
+    Work done outside of a step (e.g. reading or saving the workbook) is
+    recorded under the step name 'run'.
+    
+    Args:
+        phase (str): Phase name (read, prompt, network, write), if timing a phase
+        seconds (float): Time spent in the phase
+        **counters: Counter increments, e.g. prompt_tokens=120, retries=1
+    """
+    step_name = getattr(_metrics_local, 'step', 'run')
+    with _metrics_lock:
+        metrics = _get_step_metrics(step_name)
+        if phase:
+            metrics['phases'][phase] = metrics['phases'].get(phase, 0.0) + seconds
+        for counter, value in counters.items():
+            metrics['counters'][counter] = metrics['counters'].get(counter, 0) + value
+
+@contextmanager
+def timed_phase(phase):
+    """
+    Time the enclosed block as a phase of the current step.
+    
+    Args:
+        phase (str): Phase name (read, prompt, network, write)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_metric(phase, time.perf_counter() - start)
+
+@contextmanager
+def step_metrics(step_name, timed=True):
+    """
+    Attribute all metrics recorded by this thread in the enclosed block to a step.
+    
+    Args:
+        step_name: Step number or name
+        timed (bool): Add the block's duration to the step duration (False for
+            helper threads working on behalf of a step that is already timed)
+    """
+    previous_step = getattr(_metrics_local, 'step', 'run')
+    _metrics_local.step = str(step_name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timed:
+            with _metrics_lock:
+                _get_step_metrics(str(step_name))['duration'] += time.perf_counter() - start
+        _metrics_local.step = previous_step
+
+def build_run_report():
+    """
+    Build the run report from the recorded metrics.
+    
+    Returns:
+        dict: Run start/duration, per-step durations, phases and counters, and totals
+    """
+    with _metrics_lock:
+        steps = json.loads(json.dumps(_run_metrics['steps']))
+        started = _run_metrics['started']
+    totals = {}
+    for metrics in steps.values():
+        for counter, value in metrics['counters'].items():
+            totals[counter] = totals.get(counter, 0) + value
+    return {
+        'started': datetime.fromtimestamp(started, timezone.utc).isoformat(),
+        'duration': round(time.time() - started, 3),
+        'excel_file': EXCEL_FILE_PATH,
+        'sheet': SHEET_NAME,
+        'steps': steps,
+        'totals': totals,
+    }
+
+def _copy_file_mode(filepath, temp_filepath):
+    """
+    Give a temporary file (created 0600 by mkstemp) the permissions of the
+    file it is about to replace, or the usual permissions of a new file.
+    """
+    if os.path.exists(filepath):
+        shutil.copymode(filepath, temp_filepath)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_filepath, 0o666 & ~umask)
+
+def _write_file_atomically(filepath, content):
+    """Write a text file through a temporary file and rename, so readers never see a partial file."""
+    fd, temp_filepath = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(os.path.abspath(filepath)))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        _copy_file_mode(filepath, temp_filepath)
+        os.replace(temp_filepath, filepath)
+    except Exception:
+        os.remove(temp_filepath)
+        raise
+
+def write_run_report(filepath, report):
+    """
+    Write the run report as JSON.
+    
+    Args:
+        filepath (str): Output file path
+        report (dict): Report from build_run_report()
+    
+    Returns:
+        bool: True if successful, False if error occurs
+    """
+    try:
+        _write_file_atomically(filepath, json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"📊 Run report written: {filepath}")
+        return True
+    except Exception as e:
+        print(f"❌ Error writing run report: {e}")
+        return False
+
+def start_profiling(directory):
+    """
+    Enable profiling (--profile): start tracemalloc and clear earlier results.
+    
+    Args:
+        directory (str): Folder that receives the pstats files and summary
+    """
+    import tracemalloc
+    os.makedirs(directory, exist_ok=True)
+    with _profile_lock:
+        _profiling.update(dir=directory, stats={}, summary={}, active=0)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def write_profile_report():
+    """
+    Write one .pstats file per profiled step/helper and a summary.txt with
+    calls, time and allocation peak of each, and print the summary.
+    
+    The pstats files can be inspected with `python -m pstats <file>` or a
+    viewer such as snakeviz. Allocation peaks of steps that ran in parallel
+    overlap.
+    
+    Returns:
+        bool: True if successful (or profiling is disabled), False if error occurs
+    """
+    directory = _profiling['dir']
+    if directory is None:
+        return True
+    with _profile_lock:
+        stats = dict(_profiling['stats'])
+        summary = sorted(_profiling['summary'].items(), key=lambda item: item[1]['seconds'], reverse=True)
+    lines = [f"{'Block':<32}{'Calls':>7}{'Seconds':>11}{'Peak MiB':>10}"]
+    for name, entry in summary:
+        lines.append(f"{name:<32}{entry['calls']:>7}{entry['seconds']:>11.3f}{entry['peak_bytes'] / 1048576:>10.2f}")
+    try:
+        for name, stat in stats.items():
+            stat.dump_stats(os.path.join(directory, f"{name.replace(' ', '_')}.pstats"))
+        _write_file_atomically(os.path.join(directory, 'summary.txt'), '\n'.join(lines) + '\n')
+    except Exception as e:
+        print(f"❌ Error writing profile: {e}")
+        return False
+    print(f"🔬 Profile written to {directory} ({len(stats)} pstats files):")
+    for line in lines:
+        print(f"   {line}")
+    return True
+
+def _prometheus_labels(**labels):
+    """Format Prometheus labels, escaping backslashes, quotes and newlines."""
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def write_prometheus_textfile(filepath, report):
+    """
+    Write the run report in the Prometheus text exposition format, for the
+    node_exporter textfile collector.
+    
+    Args:
+        filepath (str): Output file path (should end with .prom)
+        report (dict): Report from build_run_report()
+    
+    Returns:
+        bool: True if successful, False if error occurs
+    """
+    sheet_labels = {'excel_file': os.path.basename(report['excel_file']), 'sheet': report['sheet']}
+    lines = [
+        "# HELP youtube_ai_run_duration_seconds Wall-clock duration of the last run.",
+        "# TYPE youtube_ai_run_duration_seconds gauge",
+        f"youtube_ai_run_duration_seconds{_prometheus_labels(**sheet_labels)} {report['duration']}",
+        "# HELP youtube_ai_step_duration_seconds Duration of each step in the last run.",
+        "# TYPE youtube_ai_step_duration_seconds gauge",
+    ]
+    for step_name, metrics in report['steps'].items():
+        labels = _prometheus_labels(**sheet_labels, step=step_name)
+        lines.append(f"youtube_ai_step_duration_seconds{labels} {metrics['duration']:.6f}")
+    lines += [
+        "# HELP youtube_ai_phase_duration_seconds Time spent per phase (read, prompt, network, write).",
+        "# TYPE youtube_ai_phase_duration_seconds gauge",
+    ]
+    for step_name, metrics in report['steps'].items():
+        for phase, seconds in metrics['phases'].items():
+            labels = _prometheus_labels(**sheet_labels, step=step_name, phase=phase)
+            lines.append(f"youtube_ai_phase_duration_seconds{labels} {seconds:.6f}")
+    lines += [
+        "# HELP youtube_ai_step_events Counters per step (tokens, API calls, retries, cache hits).",
+        "# TYPE youtube_ai_step_events gauge",
+    ]
+    for step_name, metrics in report['steps'].items():
+        for counter, value in metrics['counters'].items():
+            labels = _prometheus_labels(**sheet_labels, step=step_name, counter=counter)
+            lines.append(f"youtube_ai_step_events{labels} {value}")
+    
+    try:
+        _write_file_atomically(filepath, '\n'.join(lines) + '\n')
+        print(f"📊 Prometheus metrics written: {filepath}")
+        return True
+    except Exception as e:
+        print(f"❌ Error writing Prometheus metrics: {e}")
+        return False
+
+def get_workbook_fingerprint():
+    """
+    Get a cheap fingerprint of the Excel file (modification time and size).
+    
+    Returns:
+        tuple: (mtime in nanoseconds, size in bytes)
+    """
+    stat = os.stat(EXCEL_FILE_PATH)
+    return stat.st_mtime_ns, stat.st_size
+
+def read_cells(cells):
+    """
+    Read the values of specific cells of the Shorts_Automation sheet.
+    
+    The workbook is opened in read-only (streaming) mode, only the sheet
+    named SHEET_NAME is parsed, and only the rows and columns spanned by the
+    requested cells are read, so load time and memory do not grow with the
+    rest of the workbook. Results are kept per file fingerprint, so repeated
+    reads of an unchanged file do not parse it again.
+    
+    Args:
+        cells (list): Cell references, e.g. ['C2', 'C3']
+    
+    Returns:
+        dict: Cell reference → value (values only, not formulas)
+    
+    Raises:
+        KeyError: If the sheet does not exist in the workbook
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils import coordinate_to_tuple
+    
+    snapshot_key = (os.path.abspath(EXCEL_FILE_PATH), SHEET_NAME, tuple(cells))
+    fingerprint = get_workbook_fingerprint()
+    with _snapshot_lock:
+        snapshot = _workbook_snapshots.get(snapshot_key)
+    if snapshot and snapshot['fingerprint'] == fingerprint:
+        return dict(snapshot['data'])
+    
+    positions = {cell: coordinate_to_tuple(cell) for cell in cells}
+    min_row = min(row for row, _ in positions.values())
+    max_row = max(row for row, _ in positions.values())
+    min_col = min(column for _, column in positions.values())
+    max_col = max(column for _, column in positions.values())
+    
+    workbook = load_workbook(EXCEL_FILE_PATH, read_only=True, data_only=True)
+    try:
+        if SHEET_NAME not in workbook.sheetnames:
+            raise KeyError(f"Sheet '{SHEET_NAME}' not found in workbook. Available sheets: {workbook.sheetnames}")
+        sheet = workbook[SHEET_NAME]
+        values = {}
+        rows = sheet.iter_rows(min_row=min_row, max_row=max_row,
+                               min_col=min_col, max_col=max_col, values_only=True)
+        for row_number, row in enumerate(rows, start=min_row):
+            for offset, value in enumerate(row):
+                values[(row_number, min_col + offset)] = value
+    finally:
+        workbook.close()
+    
+    data = {cell: values.get(position) for cell, position in positions.items()}
+    with _snapshot_lock:
+        _workbook_snapshots[snapshot_key] = {'fingerprint': fingerprint, 'data': dict(data)}
+    return data
+
+@profiled
+def read_excel_data():
+    """
+    Read data from specified Excel cells in the Shorts_Automation sheet.
+    
+    Uses data_only=True to read actual cell values instead of formulas.
+    Reads from cells: C2, C3, C9, C10, C11, C12 and, in the same pass, the
+    Excel target cells B4, B6, B9, B10 (see read_cells())
+    
+    Returns:
+        dict: Dictionary containing cell names as keys and cell values as values
+        None: If file not found or error occurs
+    """
+    try:
+        print(f"📖 Reading Excel file: {EXCEL_FILE_PATH}")
+        read_start = time.perf_counter()
+        # Read data from specified cells (values only, not formulas)
+        sources = [step['source'] for step in WORKFLOW_STEPS]
+        targets = [step['target'] for step in WORKFLOW_STEPS if step['kind'] == 'excel']
+        data = read_cells(sources + targets)
+        
+        print("✅ Excel data read successfully (cell values only):")
+        for cell in sources:
+            value = data[cell]
+            preview = str(value)[:50] + "..." if value and len(str(value)) > 50 else str(value)
+            print(f"   {cell}: {preview}")
+        
+        record_metric('read', time.perf_counter() - read_start)
+        return data
+        
+    except FileNotFoundError:
+        print(f"❌ Excel file not found: {EXCEL_FILE_PATH}")
+        return None
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return None
+    except Exception as e:
+        print(f"❌ Error reading Excel file: {e}")
+        return None
+
+@profiled
+def write_to_excel(cell, value):
+    """
+    Queue data to be written to a specific Excel cell.
+    
+    Updates are buffered in memory and written to the workbook together by
+    flush_excel_writes(), so a run loads and saves the workbook only once.
+    
+    Args:
+        cell (str): Cell reference (e.g., 'B4', 'B6')
+        value (str): Value to write to the cell
+    
+    Returns:
+        bool: True if the update was queued
+    """
+    with _excel_lock:
+        _pending_excel_writes[cell] = value
+    print(f"📝 Queued Excel cell {cell} for writing")
+    return True
+
+@profiled
+def flush_excel_writes():
+    """
+    Write all queued cell updates to the Excel file in a single save.
+    
+    The workbook is saved to a temporary file next to the Excel file and then
+    renamed over it, so the workbook is never left half-written if the process
+    dies during the save. Updates stay queued if the save fails.
+    
+    Returns:
+        bool: True if successful (or nothing to write), False if error occurs
+    """
+    with _excel_lock, timed_phase('write'):
+        if not _pending_excel_writes:
+            return True
+        temp_filepath = None
+        try:
+            from openpyxl import load_workbook
+            loaded = get_workbook_fingerprint()
+            workbook = load_workbook(EXCEL_FILE_PATH)
+            sheet = workbook[SHEET_NAME]
+            for cell, value in _pending_excel_writes.items():
+                sheet[cell] = value
+            
+            # Save next to the target so the rename stays on the same filesystem
+            fd, temp_filepath = tempfile.mkstemp(
+                suffix='.xlsx', prefix='~tmp_', dir=os.path.dirname(EXCEL_FILE_PATH) or None)
+            os.close(fd)
+            workbook.save(temp_filepath)
+            workbook.close()
+            _copy_file_mode(EXCEL_FILE_PATH, temp_filepath)
+            os.replace(temp_filepath, EXCEL_FILE_PATH)
+            if _excel_saves['first_loaded'] is None:
+                _excel_saves['first_loaded'] = loaded
+            elif loaded != _excel_saves['last_saved']:
+                _excel_saves['external'] = True
+            _excel_saves['last_saved'] = get_workbook_fingerprint()
+            
+            cells = list(_pending_excel_writes)
+            _pending_excel_writes.clear()
+            print(f"✅ Written to Excel cells: {', '.join(cells)}")
+            return True
+        except Exception as e:
+            print(f"❌ Error writing to Excel: {e}")
+            if temp_filepath and os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
+            return False
+
+def get_sheet_file_path(suffix):
+    """
+    Get the path of a file kept next to the Excel file for the current sheet.
+    
+    Files of DEFAULT_SHEET_NAME are named after the workbook alone; other
+    sheets add their name, so several sheets of one workbook never share a
+    state index, journal or log.
+    
+    Args:
+        suffix (str): File suffix, e.g. '.state.json'
+    
+    Returns:
+        str: Path of <workbook name>[.<sheet>]<suffix>
+    """
+    root = os.path.splitext(EXCEL_FILE_PATH)[0]
+    if SHEET_NAME != DEFAULT_SHEET_NAME:
+        root = f"{root}.{SHEET_NAME}"
+    return root + suffix
+
+def get_text_file_path(filename):
+    """
+    Get the path of an output text file (same directory as the Excel file).
+    
+    Sheets other than DEFAULT_SHEET_NAME add their name, e.g.
+    ShortEng_AT.Channel2.txt.
+    
+    Args:
+        filename (str): Base filename without extension
+    
+    Returns:
+        str: Full path of the .txt file
+    """
+    if SHEET_NAME != DEFAULT_SHEET_NAME:
+        filename = f"{filename}.{SHEET_NAME}"
+    return os.path.join(os.path.dirname(EXCEL_FILE_PATH), f"{filename}.txt")
+
+def write_to_text_file(filename, content):
+    """
+    Write content to a text file in the same directory as the Excel file.
+    
+    Args:
+        filename (str): Base filename without extension
+        content (str): Content to write to the file
+    
+    Returns:
+        bool: True if successful, False if error occurs
+    """
+    try:
+        filepath = get_text_file_path(filename)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"✅ Written to text file: {os.path.basename(filepath)}")
+        return True
+    except Exception as e:
+        print(f"❌ Error writing to text file: {e}")
+        return False
+
+def create_temp_file(cell_name, content):
+    """
+    Create temporary text file with cell content for processing.
+    
+    Args:
+        cell_name (str): Name of the cell (e.g., 'C2', 'C3')
+        content: Cell content to write to temporary file
+    
+    Returns:
+        str: Filepath of created temporary file or None if error occurs
+    """
+    try:
+        temp_filename = f"temp_{cell_name}.txt"
+        temp_filepath = os.path.join(os.path.dirname(EXCEL_FILE_PATH), temp_filename)
+        # Ensure we write the actual cell value (not formula) to the temp file
+        cell_value = str(content) if content is not None else ""
+        with open(temp_filepath, 'w', encoding='utf-8') as f:
+            f.write(cell_value)
+        print(f"📄 Created temporary file: {temp_filename} (cell value only)")
+        return temp_filepath
+    except Exception as e:
+        print(f"❌ Error creating temporary file: {e}")
+        return None
+
+@profiled
+def create_temp_word_file(cell_name, content):
+    """
+    Create temporary Word file with cell content, preserving formatting and newlines.
+    
+    This enhanced version splits content by newlines and creates separate paragraphs
+    to preserve the original structure and formatting.
+    
+    Args:
+        cell_name (str): Name of the cell (e.g., 'C11', 'C12')
+        content: Cell content to write to temporary Word file
+    
+    Returns:
+        str: Filepath of created temporary Word file or None if error occurs
+    """
+    try:
+        from docx import Document
+        temp_filename = f"temp_{cell_name}.docx"
+        temp_filepath = os.path.join(os.path.dirname(EXCEL_FILE_PATH), temp_filename)
+        
+        # Create a new Word document
+        doc = Document()
+        # Ensure we write the actual cell value (not formula) to the Word file
+        cell_value = str(content) if content is not None else ""
+        
+        # Preserve line breaks and formatting by splitting on newlines
+        if '\n' in cell_value:
+            # Split content by newlines and add each as separate paragraph
+            lines = cell_value.split('\n')
+            for line in lines:
+                doc.add_paragraph(line)
+        else:
+            # Single paragraph for content without newlines
+            doc.add_paragraph(cell_value)
+        
+        doc.save(temp_filepath)
+        
+        print(f"📄 Created temporary Word file: {temp_filename} (preserving all content and formatting)")
+        return temp_filepath
+    except Exception as e:
+        print(f"❌ Error creating temporary Word file: {e}")
+        return None
+
+def iter_docx_text(filepath):
+    """
+    Stream the text of a .docx file in document order.
+    
+    word/document.xml is parsed incrementally straight from the zip archive
+    and finished elements are cleared, so memory stays bounded and the time
+    is linear in the document size. Body paragraphs are yielded one by one;
+    a table cell is yielded as one item (its paragraphs joined by newlines)
+    at the position where the table appears. Tabs and breaks count only
+    inside runs (not tab stop definitions), and the mc:Fallback copy of
+    alternate content (e.g. text boxes) is skipped.
+    
+    Args:
+        filepath (str): Path to the Word file
+    
+    Yields:
+        str: Text of each paragraph or table cell
+    """
+    import zipfile
+    from xml.etree import ElementTree
+    
+    paragraph_tag, cell_tag, body_tag = f'{WORD_NAMESPACE}p', f'{WORD_NAMESPACE}tc', f'{WORD_NAMESPACE}body'
+    text_tag, tab_tag, run_tag = f'{WORD_NAMESPACE}t', f'{WORD_NAMESPACE}tab', f'{WORD_NAMESPACE}r'
+    break_tags = (f'{WORD_NAMESPACE}br', f'{WORD_NAMESPACE}cr')
+    fallback_tag = f'{MC_NAMESPACE}Fallback'
+    
+    with zipfile.ZipFile(filepath) as archive, archive.open('word/document.xml') as document:
+        body = None
+        paragraphs = []     # Text runs of each open paragraph (text boxes nest them)
+        cell_lines = []     # Finished paragraphs of the current table cell
+        cell_depth = 0      # > 0 while inside a table cell (tables can be nested)
+        run_depth = 0       # > 0 while inside a run (w:tab is also a tab stop in w:pPr)
+        fallback_depth = 0  # > 0 while inside an mc:Fallback copy of a text box
+        for event, elem in ElementTree.iterparse(document, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == fallback_tag:
+                    fallback_depth += 1
+                elif fallback_depth:
+                    continue
+                elif tag == paragraph_tag:
+                    paragraphs.append([])
+                elif tag == cell_tag:
+                    cell_depth += 1
+                elif tag == run_tag:
+                    run_depth += 1
+                elif tag == body_tag:
+                    body = elem
+                continue
+            
+            if tag == fallback_tag:
+                fallback_depth -= 1
+            elif fallback_depth:
+                continue
+            elif tag == run_tag:
+                run_depth -= 1
+            elif tag == text_tag and paragraphs:
+                paragraphs[-1].append(elem.text or '')
+            elif tag == tab_tag and run_depth and paragraphs:
+                paragraphs[-1].append('\t')
+            elif tag in break_tags and run_depth and paragraphs:
+                paragraphs[-1].append('\n')
+            elif tag == paragraph_tag:
+                text = ''.join(paragraphs.pop())
+                if cell_depth:
+                    cell_lines.append(text)
+                else:
+                    yield text
+                    if not paragraphs:
+                        body.clear()  # Drop the finished paragraph from the tree
+            elif tag == cell_tag:
+                cell_depth -= 1
+                if not cell_depth:
+                    yield '\n'.join(cell_lines)
+                    cell_lines.clear()
+                    elem.clear()
+
+@profiled
+def read_docx_text(filepath):
+    """
+    Read the complete text of a .docx file, one line per paragraph or table cell.
+    
+    Args:
+        filepath (str): Path to the Word file
+    
+    Returns:
+        str: Document text (see iter_docx_text())
+    """
+    return '\n'.join(iter_docx_text(filepath))
+
+def get_user_confirmation(message):
     """
-    Get AI response from OpenRouter API using the specified model.
+    Get user confirmation before proceeding with the next step.
     
     Args:
-        prompt (str): The prompt to send to the AI model
-        model (str): The AI model to use (default: deepseek/deepseek-chat:free)
+        message (str): Message to display to the user
     
     Returns:
-        str: AI response content or None if request fails
+        bool: True if user confirms (presses 'Y'), False otherwise
     """
-    api_key = os.getenv('OPENROUTER_API_KEY', 'your-api-key-here')
+    while True:
+        response = input(f"\n{message}\nPress 'Y' to continue, any other key to stop: ").strip()
+        if response.upper() == 'Y':
+            return True
+        else:
+            return False
+
+def get_state_index_path():
+    """
+    Get the path of the incremental run state index (next to the Excel file).
     
-    # Check if API key is properly configured
-    if api_key == 'your-api-key-here':
-        print("❌ Error: API key not found. Check your .env file.")
+    Returns:
+        str: Path of <workbook name>[.<sheet>].state.json
+    """
+    return get_sheet_file_path('.state.json')
+
+def _load_state_index():
+    """Load the state index from disk on first use. Call with _state_lock held."""
+    if _state_index['loaded_from'] == get_state_index_path():
+        return _state_index['entries']
+    entries = {}
+    try:
+        with open(get_state_index_path(), 'r', encoding='utf-8') as f:
+            entries = json.load(f).get('entries', {})
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"⚠️ Ignoring unreadable state index: {e}")
+    _state_index['entries'] = entries
+    _state_index['loaded_from'] = get_state_index_path()
+    return entries
+
+def get_step_input_hash(step, content):
+    """
+    Hash everything that determines a step's output: the source content, the
+    target, the model and the prompt template.
+    
+    Args:
+        step (dict): Workflow step definition
+        content (str): Source content of the step
+    
+    Returns:
+        str: SHA-256 hex digest
+    """
+    if step['kind'] == 'excel':
+        template = CELL_PROMPT_TEMPLATE
+    else:
+        template = TEXT_PROMPT_TEMPLATE + CHUNK_MAP_PROMPT_TEMPLATE + CHUNK_REDUCE_PROMPT_TEMPLATE
+    fingerprint = json.dumps({
+        'content': content,
+        'target': step['target'],
+        'model': ','.join(get_model_chain()),
+        'template': template,
+        'language': step.get('language'),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+def is_step_unchanged(step, content):
+    """
+    Check whether a step's input is unchanged since it last produced an output.
+    
+    A text file target that has gone missing, or an Excel target cell that
+    was cleared or edited, is restored from the output stored in the index,
+    without calling the API.
+    
+    Args:
+        step (dict): Workflow step definition; Excel steps may carry the
+            'target_value' read along with their source cell
+        content (str): Source content of the step
+    
+    Returns:
+        bool: True if the step can be skipped
+    """
+    with _state_lock:
+        entry = _load_state_index().get(f"{SHEET_NAME}!{step['source']}")
+    if not entry or entry.get('input_hash') != get_step_input_hash(step, content):
+        return False
+    if entry.get('target') != step['target']:
+        return False
+    if step['kind'] == 'text' and not os.path.exists(get_text_file_path(step['target'])):
+        return write_to_text_file(step['target'], entry['output'])
+    if step['kind'] == 'excel':
+        # The target's value is normally read in the same pass as the source
+        if 'target_value' in step:
+            target_value = step['target_value']
+        else:
+            target_value = read_cells([step['target']]).get(step['target'])
+        if target_value != entry['output']:
+            print(f"♻️ Restoring {step['target']} from the stored output")
+            return write_to_excel(step['target'], entry['output'])
+    return True
+
+def record_step_state(step, content, response):
+    """
+    Remember the input hash and output of a successful step.
+    
+    The index is written to disk by save_state_index().
+    
+    Args:
+        step (dict): Workflow step definition
+        content (str): Source content of the step
+        response (str): Output the step produced
+    """
+    with _state_lock:
+        entries = _load_state_index()
+        entries[f"{SHEET_NAME}!{step['source']}"] = {
+            'input_hash': get_step_input_hash(step, content),
+            'target': step['target'],
+            'output': response,
+            'updated': datetime.now(timezone.utc).isoformat(),
+        }
+        _state_index['dirty'] = True
+
+def save_state_index():
+    """
+    Write the state index next to the Excel file if it changed in this run.
+    
+    Returns:
+        bool: True if successful (or nothing to save), False if error occurs
+    """
+    with _state_lock:
+        if not _state_index['dirty']:
+            return True
+        try:
+            content = json.dumps({'version': 1, 'entries': _state_index['entries']}, indent=1, ensure_ascii=False)
+            _write_file_atomically(get_state_index_path(), content)
+            _state_index['dirty'] = False
+            return True
+        except Exception as e:
+            print(f"❌ Error writing state index: {e}")
+            return False
+
+def get_journal_path():
+    """
+    Get the path of the run journal (next to the Excel file).
+    
+    Returns:
+        str: Path of <workbook name>[.<sheet>].journal.jsonl
+    """
+    return get_sheet_file_path('.journal.jsonl')
+
+def _get_journal_key(step):
+    """Journal key of a step: sheet name and source cell."""
+    return f"{SHEET_NAME}!{step['source']}"
+
+def _write_journal_record(record):
+    """Append a record to the journal and force it to disk. Call with _journal_lock held."""
+    if _journal['file'] is None:
+        return
+    _journal['file'].write(json.dumps(record, ensure_ascii=False) + '\n')
+    _journal['file'].flush()
+    os.fsync(_journal['file'].fileno())
+
+def start_journal(steps, resume=False):
+    """
+    Open the write-ahead run journal.
+    
+    A new run truncates the journal and records every step as pending. With
+    resume=True the existing journal is read first, so steps that finished in
+    the interrupted run can be replayed by get_journaled_response(), and new
+    records are appended.
+    
+    Args:
+        steps (list): Steps that this run is going to process
+        resume (bool): Continue the run recorded in the existing journal
+    """
+    if not get_setting('RUN_JOURNAL'):
+        return
+    journal_path = get_journal_path()
+    with _journal_lock:
+        _journal['states'] = {}
+        if resume:
+            try:
+                with open(journal_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Torn last line from a crash
+                        if 'step' in record:
+                            _journal['states'][record['step']] = record
+            except FileNotFoundError:
+                print("⚠️ No run journal found, starting a new run")
+            done = sum(1 for record in _journal['states'].values() if record['state'] == 'done')
+            print(f"📒 Resuming run: {done} step(s) already done, {len(steps) - done} remaining")
+        try:
+            _journal['file'] = open(journal_path, 'a' if resume else 'w', encoding='utf-8')
+        except OSError as e:
+            print(f"⚠️ Could not open run journal: {e}")
+            return
+        _journal['resume'] = resume
+        _write_journal_record({'event': 'resume' if resume else 'start', 'time': time.time()})
+        for step in steps:
+            key = _get_journal_key(step)
+            if _journal['states'].get(key, {}).get('state') != 'done':
+                _journal['states'][key] = {'step': key, 'state': 'pending'}
+                _write_journal_record(_journal['states'][key])
+
+def journal_step(step, state, content=None, response=None):
+    """
+    Record a step's state in the run journal.
+    
+    Args:
+        step (dict): Workflow step definition
+        state (str): 'in-flight', 'done', 'skipped' (input unchanged) or 'failed'
+        content (str): Source content of the step (recorded for 'done')
+        response (str): Step output (recorded for 'done')
+    """
+    record = {'step': _get_journal_key(step), 'state': state, 'target': step['target'], 'time': time.time()}
+    if state == 'done':
+        record['input_hash'] = get_step_input_hash(step, content)
+        record['response'] = response
+    with _journal_lock:
+        _write_journal_record(record)
+        _journal['states'][record['step']] = record
+
+def get_journaled_response(step, content):
+    """
+    Get the output of a step that already finished in the run being resumed.
+    
+    Args:
+        step (dict): Workflow step definition
+        content (str): Current source content of the step
+    
+    Returns:
+        str: Recorded output, or None if the step has to run (not resuming,
+        not done, or the source content changed since)
+    """
+    with _journal_lock:
+        if not _journal['resume']:
+            return None
+        record = _journal['states'].get(_get_journal_key(step), {})
+    if record.get('state') != 'done' or record.get('target') != step['target']:
+        return None
+    if record.get('input_hash') != get_step_input_hash(step, content):
         return None
+    return record.get('response')
+
+def close_journal():
+    """
+    Record the end of the run and close the journal.
     
-    # Set up headers for OpenRouter API
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://localhost",
-        "X-Title": "YouTube AI Chat",
-    }
+    The run is marked 'finish' when every journaled step is done or skipped
+    as unchanged, otherwise 'stop' (steps were declined, failed or never
+    started).
+    """
+    with _journal_lock:
+        if _journal['file'] is None:
+            return
+        finished = all(record['state'] in ('done', 'skipped') for record in _journal['states'].values())
+        _write_journal_record({'event': 'finish' if finished else 'stop', 'time': time.time()})
+        _journal['file'].close()
+        _journal['file'] = None
+        _journal['resume'] = False
+
+def get_results_db_path():
+    """
+    Get the path of the results database (RESULTS_DB_PATH setting, or
+    <workbook name>.results.sqlite next to the Excel file).
     
-    # Prepare request data
-    data = {
-        "model": model,
-        "messages": [{"role": "user", "content": prompt}]
-    }
+    Returns:
+        str: Database path
+    """
+    return get_setting('RESULTS_DB_PATH') or os.path.splitext(EXCEL_FILE_PATH)[0] + '.results.sqlite'
+
+def open_results_db():
+    """
+    Open the results database in WAL mode, creating the schema if needed.
+    
+    Outputs are unique per workbook, sheet, source cell and input hash, so a
+    re-generated output replaces the previous one for the same input while
+    outputs for earlier inputs stay in the history.
+    
+    Returns:
+        sqlite3.Connection: Open connection (close it after use)
+    """
+    import sqlite3
+    connection = sqlite3.connect(get_results_db_path(), timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript('''
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY,
+            workbook TEXT NOT NULL,
+            sheet TEXT NOT NULL,
+            row INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            step TEXT NOT NULL,
+            target TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            model TEXT NOT NULL,
+            input_hash TEXT NOT NULL,
+            output TEXT NOT NULL,
+            updated TEXT NOT NULL,
+            UNIQUE (workbook, sheet, source, input_hash)
+        );
+        CREATE INDEX IF NOT EXISTS results_row ON results (workbook, sheet, row);
+        CREATE INDEX IF NOT EXISTS results_step ON results (step);
+        CREATE INDEX IF NOT EXISTS results_model ON results (model);
+        CREATE INDEX IF NOT EXISTS results_input_hash ON results (input_hash);
+    ''')
+    return connection
+
+def record_result(step, content, response):
+    """
+    Queue a generated output for the results database.
+    
+    The output is stored under the first row of its short (the block start
+    in batch mode), so all outputs of one short share a row. Outputs are inserted in batches by flush_results(), which runs
+    automatically once RESULTS_BATCH_SIZE outputs are queued.
+    
+    Args:
+        step (dict): Workflow step definition
+        content (str): Source content of the step
+        response (str): Output the step produced
+    """
+    if not get_setting('RESULTS_DB'):
+        return
+    with _results_lock:
+        _pending_results.append((
+            os.path.abspath(EXCEL_FILE_PATH), SHEET_NAME, step.get('row', get_workflow_rows()[0]),
+            step['source'], str(step['number']), step['target'], step['kind'], ','.join(get_model_chain()),
+            get_step_input_hash(step, content), response, datetime.now(timezone.utc).isoformat(),
+        ))
+        batch_full = len(_pending_results) >= get_setting('RESULTS_BATCH_SIZE')
+    if batch_full:
+        flush_results()
+
+def flush_results():
+    """
+    Insert the queued outputs into the results database in one transaction.
+    
+    Returns:
+        bool: True if successful (or nothing to insert), False if error occurs
+    """
+    with _results_lock:
+        if not _pending_results:
+            return True
+        try:
+            with timed_phase('write'):
+                connection = open_results_db()
+                try:
+                    with connection:
+                        connection.executemany('''
+                            INSERT INTO results (workbook, sheet, row, source, step, target, kind,
+                                                 model, input_hash, output, updated)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (workbook, sheet, source, input_hash)
+                            DO UPDATE SET output = excluded.output, model = excluded.model,
+                                          updated = excluded.updated
+                        ''', _pending_results)
+                finally:
+                    connection.close()
+            print(f"🗄️ Stored {len(_pending_results)} output(s) in {os.path.basename(get_results_db_path())}")
+            _pending_results.clear()
+            return True
+        except Exception as e:
+            print(f"❌ Error writing results database: {e}")
+            return False
+
+def get_latest_results(rows=None):
+    """
+    Get the most recent stored output of each source cell and target of the current sheet.
     
+    Args:
+        rows (tuple): Only return the shorts whose first row is in this
+            (first, last) range; last may be None for no upper limit
+    
+    Returns:
+        list: Result rows as dicts (source, step, target, kind, model, output, updated)
+    """
+    import sqlite3
+    if not os.path.exists(get_results_db_path()):
+        return []
+    query = '''
+        SELECT source, step, target, kind, model, output, MAX(updated) AS updated
+        FROM results WHERE workbook = ? AND sheet = ?
+    '''
+    parameters = [os.path.abspath(EXCEL_FILE_PATH), SHEET_NAME]
+    if rows:
+        first, last = rows
+        query += ' AND row >= ?'
+        parameters.append(first)
+        if last is not None:
+            query += ' AND row <= ?'
+            parameters.append(last)
+    query += ' GROUP BY source, target ORDER BY row, source, target'
+    connection = open_results_db()
     try:
-        # Make API request to OpenRouter
-        response = requests.post(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            data=json.dumps(data)
-        )
-        
-        # Process successful response
-        if response.status_code == 200:
-            result = response.json()
-            if 'choices' in result and len(result['choices']) > 0:
-                return result['choices'][0]['message']['content']
-            else:
-                print("❌ No response content found in API response")
-                return None
+        connection.row_factory = sqlite3.Row
+        return [dict(row) for row in connection.execute(query, parameters)]
+    finally:
+        connection.close()
+
+def export_results(rows=None):
+    """
+    Write the latest stored outputs back to their Excel cells and text files (--export-results).
+    
+    Args:
+        rows (tuple): Only export the shorts whose first row is in this
+            (first, last) range (--start-row/--end-row)
+    
+    Returns:
+        bool: True if every output was written, False otherwise
+    """
+    results = get_latest_results(rows)
+    if not results:
+        print(f"⚠️ No stored results for {os.path.basename(EXCEL_FILE_PATH)} ({SHEET_NAME})")
+        return False
+    print(f"📤 Exporting {len(results)} stored output(s) from {os.path.basename(get_results_db_path())}")
+    success = True
+    for result in results:
+        if result['kind'] == 'excel':
+            success = write_to_excel(result['target'], result['output']) and success
         else:
-            # Handle API errors
-            print(f"❌ API Error: HTTP {response.status_code}")
-            if response.status_code == 401:
-                print("🔑 Authentication Error: Invalid API key")
-            print("Response:", response.text)
+            success = write_to_text_file(result['target'], result['output']) and success
+    return flush_excel_writes() and success
+
+def build_prompt(step, content):
+    """
+    Build the AI prompt for a workflow step.
+    
+    Args:
+        step (dict): Workflow step definition from WORKFLOW_STEPS
+        content (str): Source content read for the step
+    
+    Returns:
+        str: Prompt to send to the AI model
+    """
+    if step['kind'] == 'excel':
+        return CELL_PROMPT_TEMPLATE.format(content=content, target=step['target'])
+    return TEXT_PROMPT_TEMPLATE.format(content=content, target=step['target'], language=step['language'])
+
+def split_into_chunks(paragraphs, max_tokens):
+    """
+    Pack paragraphs into chunks of at most `max_tokens` estimated tokens.
+    
+    Chunks break on paragraph boundaries; a single paragraph that is larger
+    than the budget is cut into pieces of the maximum size.
+    
+    Args:
+        paragraphs (list): Paragraph texts in document order
+        max_tokens (int): Token budget per chunk
+    
+    Returns:
+        list: Chunk texts (paragraphs joined with newlines)
+    """
+    max_chars = max_tokens * 4
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in paragraphs:
+        pieces = [paragraph[i:i + max_chars] for i in range(0, len(paragraph), max_chars)] or ['']
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append('\n'.join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
+
+def get_map_reduce_response(step, chunks, stream_path=None):
+    """
+    Generate a text file response for content that is too large for one prompt.
+    
+    Map: every chunk is condensed into notes by its own API call, with the
+    calls running concurrently. Reduce: one final call writes the response
+    from the combined notes. If the notes are still too large, they are
+    mapped again.
+    
+    Args:
+        step (dict): Workflow step definition (a text file step)
+        chunks (list): Content chunks from split_into_chunks()
+        stream_path (str): Stream the final response into this file (see get_ai_response())
+    
+    Returns:
+        str: AI response content or None if any call fails
+    """
+    max_tokens = get_setting('CHUNK_MAX_TOKENS')
+    step_name = getattr(_metrics_local, 'step', 'run')
+    
+    deadline = get_step_deadline()
+    
+    def map_chunk(index, chunk):
+        with step_metrics(step_name, timed=False), step_deadline(deadline):
+            prompt = CHUNK_MAP_PROMPT_TEMPLATE.format(
+                content=chunk, index=index, count=len(chunks), target=step['target'], language=step['language'])
+            return get_ai_response(prompt)
+    
+    while True:
+        print(f"🧩 Processing {len(chunks)} content chunks for {step['target']} concurrently")
+        workers = max(1, min(get_setting('CHUNK_WORKERS'), len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            notes = list(executor.map(map_chunk, range(1, len(chunks) + 1), chunks))
+        if not all(notes):
+            print(f"❌ Failed to process {notes.count(None)} of {len(chunks)} chunks")
             return None
-            
-    except Exception as e:
-        print(f"❌ Request failed: {e}")
+        
+        combined_notes = '\n\n'.join(f"[Part {index}]\n{note}" for index, note in enumerate(notes, start=1))
+        if estimate_tokens(combined_notes) <= max_tokens:
+            break
+        next_chunks = split_into_chunks(combined_notes.split('\n'), max_tokens)
+        # Stop condensing once another round would not reduce the number of chunks
+        if len(next_chunks) >= len(chunks):
+            break
+        chunks = next_chunks
+    
+    prompt = CHUNK_REDUCE_PROMPT_TEMPLATE.format(
+        content=combined_notes, count=len(notes), target=step['target'], language=step['language'])
+    return get_ai_response(prompt, stream_path=stream_path)
+
+def get_step_content(step, cell_value):
+    """
+    Get the text sent to the AI for a workflow step, entirely in memory.
+    
+    Text file steps normalize Windows line endings so every line of the cell
+    stays a separate paragraph, as it did with the former temporary Word file.
+    A text file step whose cell holds the path of a .docx file (absolute, or
+    relative to the Excel file) uses the text of that document instead.
+    
+    Args:
+        step (dict): Workflow step definition from WORKFLOW_STEPS
+        cell_value: Value of the step's source cell
+    
+    Returns:
+        str: Cell value as text ("" for an empty cell)
+    """
+    content = str(cell_value) if cell_value is not None else ""
+    if step['kind'] == 'text':
+        docx_path = os.path.join(os.path.dirname(EXCEL_FILE_PATH), content.strip())
+        if content.strip().lower().endswith('.docx') and os.path.isfile(docx_path):
+            try:
+                content = read_docx_text(docx_path)
+            except Exception as e:
+                print(f"❌ Error reading Word file {content.strip()}: {e}")
+                return ""
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+def dump_intermediate(step, content):
+    """
+    Save a step's source content to disk for debugging (--debug-intermediates).
+    
+    Excel cell steps are dumped as temp_<cell>.txt and text file steps as
+    temp_<cell>.docx next to the Excel file. The files are left in place.
+    
+    Args:
+        step (dict): Workflow step definition from WORKFLOW_STEPS
+        content (str): Source content of the step
+    """
+    if step['kind'] == 'excel':
+        create_temp_file(step['source'], content)
+    else:
+        create_temp_word_file(step['source'], content)
+
+def process_step(step, cell_value):
+    """
+    Process one workflow step: source cell → AI → target cell or text file.
+    
+    The cell content is passed to the AI directly from memory; intermediate
+    files are only written when DEBUG_INTERMEDIATES is enabled.
+    
+    Args:
+        step (dict): Workflow step definition from WORKFLOW_STEPS
+        cell_value: Value of the step's source cell
+    
+    Returns:
+        bool: True if the response was generated and saved, False otherwise,
+        STEP_UNCHANGED if the input did not change since the last run, or
+        STEP_REPLAYED if the output was replayed from the run journal
+    """
+    with step_metrics(step['number']), step_deadline(), profile_block(f"step {step['number']}"):
+        return _process_step(step, cell_value)
+
+def _process_step(step, cell_value):
+    """Process one workflow step (see process_step())."""
+    number, source, target = step['number'], step['source'], step['target']
+    content = get_step_content(step, cell_value)
+    skipped_result = skip_or_replay_step(step, content)
+    if skipped_result is not None:
+        return skipped_result
+    
+    print(f"\n🔄 STEP {number}: Processing {source} content")
+    print(f"📝 Content preview: {content[:100]}...")
+    
+    if get_setting('DEBUG_INTERMEDIATES'):
+        dump_intermediate(step, content)
+    if not content:
+        return False
+    
+    # Oversized text file content is split into chunks for a map-reduce run
+    with timed_phase('prompt'):
+        chunks = []
+        if step['kind'] == 'text' and estimate_tokens(content) > get_setting('CHUNK_MAX_TOKENS'):
+            chunks = split_into_chunks(content.split('\n'), get_setting('CHUNK_MAX_TOKENS'))
+        prompt = build_prompt(step, content) if len(chunks) <= 1 else None
+    
+    # Generate AI response (text file steps can stream straight into the file)
+    journal_step(step, 'in-flight')
+    streaming = step['kind'] == 'text' and get_setting('API_STREAM')
+    stream_path = get_text_file_path(target) if streaming else None
+    if streaming:
+        print(f"\n📝 AI Response for {target} (streaming):")
+    if prompt is None:
+        response = get_map_reduce_response(step, chunks, stream_path)
+    else:
+        response = get_ai_response(prompt, stream_path=stream_path)
+    if not response:
+        print(f"❌ Failed to get AI response for {target}")
+        journal_step(step, 'failed')
+        return False
+    
+    if not streaming:
+        print(f"\n📝 AI Response for {target}:\n{response}")
+    return save_step_response(step, content, response)
+
+def skip_or_replay_step(step, content):
+    """
+    Finish a step without an API call when possible.
+    
+    The output is replayed from the run journal when resuming, or the step
+    is skipped when its input is unchanged since the last run.
+    
+    Args:
+        step (dict): Workflow step definition
+        content (str): Source content of the step
+    
+    Returns:
+        STEP_REPLAYED, STEP_UNCHANGED or False (replay failed) when the step
+        is finished, None if it still has to be processed
+    """
+    number, source, target = step['number'], step['source'], step['target']
+    journaled_response = get_journaled_response(step, content)
+    if journaled_response is not None:
+        print(f"🔁 Step {number} replayed from run journal: {source} → {target}")
+        if step['kind'] == 'excel':
+            success = write_to_excel(target, journaled_response)
+        else:
+            success = write_to_text_file(target, journaled_response)
+        if success:
+            record_result(step, content, journaled_response)
+        return STEP_REPLAYED if success else False
+    if get_setting('INCREMENTAL') and is_step_unchanged(step, content):
+        print(f"⏩ Step {number} skipped: {source} unchanged since the last run")
+        journal_step(step, 'skipped')
+        return STEP_UNCHANGED
+    return None
+
+def save_step_response(step, content, response):
+    """
+    Journal a step's response and save it to the target Excel cell or text file.
+    
+    Args:
+        step (dict): Workflow step definition
+        content (str): Source content of the step
+        response (str): AI response for the step
+    
+    Returns:
+        bool: True if successful, False if error occurs
+    """
+    number, source, target = step['number'], step['source'], step['target']
+    journal_step(step, 'done', content, response)
+    # Save to Excel cell or text file
+    with timed_phase('write'):
+        if step['kind'] == 'excel':
+            success = write_to_excel(target, response)
+        else:
+            success = write_to_text_file(target, response)
+    if success:
+        record_step_state(step, content, response)
+        record_result(step, content, response)
+    if step['kind'] == 'excel':
+        print(f"✅ Step {number} completed: {source} → {target}")
+    else:
+        print(f"✅ Step {number} completed: {source} → {target}.txt")
+    return success
+
+def parse_bundled_response(response, targets):
+    """
+    Parse the JSON object returned for a bundled request.
+    
+    Code fences and text around the object are ignored.
+    
+    Args:
+        response (str): AI response content
+        targets (list): Target cells that must all be present
+    
+    Returns:
+        dict: Target cell → response text, or None if the response is unusable
+    """
+    start, end = response.find('{'), response.rfind('}')
+    if start < 0 or end <= start:
+        return None
+    try:
+        parsed = json.loads(response[start:end + 1])
+    except ValueError:
         return None
+    if not isinstance(parsed, dict):
+        return None
+    answers = {}
+    for target in targets:
+        answer = parsed.get(target)
+        if not isinstance(answer, str) or not answer.strip():
+            return None
+        answers[target] = answer
+    return answers
+
+def run_bundled_cell_steps(steps, cell_values):
+    """
+    Generate several Excel cell steps with a single structured API request.
+    
+    The cell prompts are sent together and the model is asked for a JSON
+    object keyed by target cell. Steps that can be skipped or replayed are
+    finished here and left out of the bundle. If the request fails or the
+    answer cannot be parsed, the bundled steps get no result, so the caller
+    falls back to individual calls.
+    
+    Args:
+        steps (list): Excel cell steps
+        cell_values (dict): Source cell → value
+    
+    Returns:
+        dict: Step number → result for the steps finished here
+    """
+    results = {}
+    pending = []
+    for step in steps:
+        content = get_step_content(step, cell_values[step['source']])
+        if not content:
+            continue
+        skipped_result = skip_or_replay_step(step, content)
+        if skipped_result is None:
+            pending.append((step, content))
+        else:
+            results[step['number']] = skipped_result
+            discount_step_deadlines(1)
+    if len(pending) < 2:
+        return results
+    
+    targets = [step['target'] for step, _ in pending]
+    print(f"\n📦 Bundling {len(pending)} cell steps into one request: {', '.join(targets)}")
+    # The bundle takes one share of the run deadline for all its steps
+    discount_step_deadlines(len(pending) - 1)
+    with step_metrics('bundle'), step_deadline():
+        with timed_phase('prompt'):
+            prompts = '\n\n'.join(
+                f"### {step['target']}\n{build_prompt(step, content)}" for step, content in pending)
+            prompt = BUNDLE_PROMPT_TEMPLATE.format(targets=', '.join(targets), prompts=prompts)
+        for step, _ in pending:
+            journal_step(step, 'in-flight')
+        # An answer that cannot be parsed is not cached, so the next run asks again
+        response = get_ai_response(
+            prompt, validate=lambda text: parse_bundled_response(text, targets) is not None)
+        answers = parse_bundled_response(response, targets) if response else None
+        if answers is None:
+            print("⚠️ Bundled response could not be used, falling back to individual requests")
+            discount_step_deadlines(-len(pending))
+            return results
+        
+        for step, content in pending:
+            print(f"\n📝 AI Response for {step['target']}:\n{answers[step['target']]}")
+            results[step['number']] = save_step_response(step, content, answers[step['target']])
+        return results
 
-def read_excel_data():
+def run_steps_sequential(steps, excel_data, confirm=True):
     """
-    Read data from specified Excel cells in the Shorts_Automation sheet.
+    Run workflow steps one after another.
     
-    Uses data_only=True to read actual cell values instead of formulas.
-    Reads from cells: C2, C3, C9, C10, C11, C12
+    Args:
+        steps (list): Workflow steps that have source content
+        excel_data (dict): Cell values read from Excel
+        confirm (bool): Ask the user for confirmation after each step
     
     Returns:
-        dict: Dictionary containing cell names as keys and cell values as values
-        None: If file not found or error occurs
+        dict: Step number → True/False result for every step that was run
     """
-    try:
-        print(f"📖 Reading Excel file: {EXCEL_FILE_PATH}")
-        # Use data_only=True to get cell values instead of formulas
-        workbook = load_workbook(EXCEL_FILE_PATH, data_only=True)
-        
-        # Check if the required sheet exists
-        if SHEET_NAME not in workbook.sheetnames:
-            print(f"❌ Sheet '{SHEET_NAME}' not found in workbook")
-            print(f"Available sheets: {workbook.sheetnames}")
-            return None
-            
-        sheet = workbook[SHEET_NAME]
-        # Read data from specified cells (values only, not formulas)
-        data = {
-            'C2': sheet['C2'].value,
-            'C3': sheet['C3'].value,
-            'C9': sheet['C9'].value,
-            'C10': sheet['C10'].value,
-            'C11': sheet['C11'].value,
-            'C12': sheet['C12'].value
-        }
+    results = {}
+    for step in steps:
+        results[step['number']] = process_step(step, excel_data[step['source']])
         
-        print("✅ Excel data read successfully (cell values only):")
-        for cell, value in data.items():
-            preview = str(value)[:50] + "..." if value and len(str(value)) > 50 else str(value)
-            print(f"   {cell}: {preview}")
-        
-        workbook.close()
-        return data
-        
-    except FileNotFoundError:
-        print(f"❌ Excel file not found: {EXCEL_FILE_PATH}")
-        return None
-    except Exception as e:
-        print(f"❌ Error reading Excel file: {e}")
-        return None
+        # User confirmation to continue (not needed after the final, a skipped or a replayed step)
+        if confirm and step['number'] != WORKFLOW_STEPS[-1]['number'] and results[step['number']] in (True, False):
+            # Checkpoint: save finished cells before waiting on the user
+            flush_excel_writes()
+            if not get_user_confirmation(f"🤔 Step {step['number']} completed. Continue with script execution?"):
+                print("⏹️ Script execution stopped by user.")
+                break
+    return results
 
-def write_to_excel(cell, value):
+def run_steps_parallel(steps, excel_data, max_workers):
     """
-    Write data to a specific Excel cell.
+    Run independent workflow steps concurrently on a thread pool.
+    
+    Results are collected as the steps complete, so the total run time is
+    close to the slowest single step rather than the sum of all steps.
     
     Args:
-        cell (str): Cell reference (e.g., 'B4', 'B6')
-        value (str): Value to write to the cell
+        steps (list): Workflow steps that have source content
+        excel_data (dict): Cell values read from Excel
+        max_workers (int): Maximum number of steps running at once
     
     Returns:
-        bool: True if successful, False if error occurs
+        dict: Step number → True/False result for every step
     """
-    try:
-        workbook = load_workbook(EXCEL_FILE_PATH)
-        sheet = workbook[SHEET_NAME]
-        sheet[cell] = value
-        workbook.save(EXCEL_FILE_PATH)
-        workbook.close()
-        print(f"✅ Written to Excel cell {cell}")
-        return True
-    except Exception as e:
-        print(f"❌ Error writing to Excel: {e}")
-        return False
+    results = {}
+    print(f"\n⚡ Running {len(steps)} steps in parallel (up to {max_workers} at once)")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(process_step, step, excel_data[step['source']]): step
+            for step in steps
+        }
+        for future in as_completed(futures):
+            step = futures[future]
+            try:
+                results[step['number']] = future.result()
+            except Exception as e:
+                print(f"❌ Step {step['number']} failed: {e}")
+                results[step['number']] = False
+    return results
 
-def write_to_text_file(filename, content):
+def split_cell_reference(cell):
     """
-    Write content to a text file in the same directory as the Excel file.
+    Split a cell reference into its column letters and row number.
     
     Args:
-        filename (str): Base filename without extension
-        content (str): Content to write to the file
+        cell (str): Cell reference, e.g. 'C11'
     
     Returns:
-        bool: True if successful, False if error occurs
+        tuple: (column letters, row number), e.g. ('C', 11)
     """
-    try:
-        filepath = os.path.join(os.path.dirname(EXCEL_FILE_PATH), f"{filename}.txt")
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"✅ Written to text file: {filename}.txt")
-        return True
-    except Exception as e:
-        print(f"❌ Error writing to text file: {e}")
-        return False
+    column = cell.rstrip('0123456789')
+    return column, int(cell[len(column):])
 
-def create_temp_file(cell_name, content):
+def get_workflow_rows():
     """
-    Create temporary text file with cell content for processing.
+    Get the rows used by the cells of one short (WORKFLOW_STEPS).
+    
+    Returns:
+        tuple: (first row, number of rows), (2, 11) for C2 … C12
+    """
+    cells = [step['source'] for step in WORKFLOW_STEPS]
+    cells += [step['target'] for step in WORKFLOW_STEPS if step['kind'] == 'excel']
+    rows = [split_cell_reference(cell)[1] for cell in cells]
+    return min(rows), max(rows) - min(rows) + 1
+
+def get_batch_step(step, block_start):
+    """
+    Map a workflow step onto the short whose cells start at `block_start`.
+    
+    Source and Excel target cells move down by the distance between the
+    block and the first workflow row; text file targets get a _row<N> suffix
+    (except for the short at the workflow's own rows), so every short keeps
+    its own files. The block start is kept as 'row' (see record_result()).
     
     Args:
-        cell_name (str): Name of the cell (e.g., 'C2', 'C3')
-        content: Cell content to write to temporary file
+        step (dict): Workflow step definition from WORKFLOW_STEPS
+        block_start (int): First row of the short's block
     
     Returns:
-        str: Filepath of created temporary file or None if error occurs
+        dict: Step definition for that short
     """
-    try:
-        temp_filename = f"temp_{cell_name}.txt"
-        temp_filepath = os.path.join(os.path.dirname(EXCEL_FILE_PATH), temp_filename)
-        # Ensure we write the actual cell value (not formula) to the temp file
-        cell_value = str(content) if content is not None else ""
-        with open(temp_filepath, 'w', encoding='utf-8') as f:
-            f.write(cell_value)
-        print(f"📄 Created temporary file: {temp_filename} (cell value only)")
-        return temp_filepath
-    except Exception as e:
-        print(f"❌ Error creating temporary file: {e}")
-        return None
+    offset = block_start - get_workflow_rows()[0]
+    column, row = split_cell_reference(step['source'])
+    batch_step = dict(step, number=f"{step['number']}@row{block_start}", source=f"{column}{row + offset}",
+                      row=block_start)
+    if step['kind'] == 'excel':
+        column, row = split_cell_reference(step['target'])
+        batch_step['target'] = f"{column}{row + offset}"
+    elif offset:
+        batch_step['target'] = f"{step['target']}_row{block_start}"
+    return batch_step
 
-def read_temp_file(filepath):
+def iter_batch_blocks(start_row, end_row=None, block_rows=None):
     """
-    Read content from temporary text file.
+    Stream batch jobs from the Shorts_Automation sheet, one short per job.
+    
+    The sheet holds one short per block of `block_rows` rows, laid out like
+    WORKFLOW_STEPS (C2 → B4, …, C12 → ShortHindi_AT) and shifted down by a
+    whole block for each further short. The workbook is opened in read-only
+    mode and only the source and Excel target columns are read, row by row,
+    so memory use does not grow with the size of the sheet. Each Excel step
+    carries its target cell's current value as 'target_value'.
     
     Args:
-        filepath (str): Path to the temporary file
+        start_row (int): First row of the first short
+        end_row (int): Last row to read (default: last row of the sheet)
+        block_rows (int): Rows per short (default and minimum: the rows
+            spanned by WORKFLOW_STEPS, so shorts never share cells)
     
-    Returns:
-        str: File content or None if error occurs
+    Yields:
+        list: (step, cell_value) pairs of one short's non-empty source cells
     """
+    from openpyxl import load_workbook
+    from openpyxl.utils import column_index_from_string
+    first_row, workflow_rows = get_workflow_rows()
+    block_rows = block_rows or workflow_rows
+    if block_rows < workflow_rows:
+        raise ValueError(f"a short needs {workflow_rows} rows, so blocks of {block_rows} rows would overlap")
+    
+    # Source and Excel target cells of each step relative to the start of its block
+    sources, targets = {}, {}
+    for step in WORKFLOW_STEPS:
+        column, row = split_cell_reference(step['source'])
+        sources[(row - first_row, column_index_from_string(column))] = step
+        if step['kind'] == 'excel':
+            column, row = split_cell_reference(step['target'])
+            targets[(row - first_row, column_index_from_string(column))] = step
+    min_col = min(column for _, column in list(sources) + list(targets))
+    max_col = max(column for _, column in list(sources) + list(targets))
+    
+    def finish_block(block, target_values):
+        # Targets below end_row were not read; is_step_unchanged() reads those itself
+        for step, _ in block:
+            if step['number'] in target_values:
+                step['target_value'] = target_values[step['number']]
+        return block
+    
+    workbook = load_workbook(EXCEL_FILE_PATH, read_only=True, data_only=True)
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        print(f"📖 Read content from temporary file")
-        return content
-    except Exception as e:
-        print(f"❌ Error reading temporary file: {e}")
-        return None
+        sheet = workbook[SHEET_NAME]
+        block, target_values, block_start = [], {}, start_row
+        rows = sheet.iter_rows(min_row=start_row, max_row=end_row,
+                               min_col=min_col, max_col=max_col, values_only=True)
+        for row_number, row in enumerate(rows, start=start_row):
+            if row_number >= block_start + block_rows:
+                if block:
+                    yield finish_block(block, target_values)
+                block, target_values = [], {}
+                block_start += (row_number - block_start) // block_rows * block_rows
+            for column, value in enumerate(row, start=min_col):
+                position = (row_number - block_start, column)
+                step = sources.get(position)
+                if step is not None and value is not None and str(value).strip():
+                    block.append((get_batch_step(step, block_start), value))
+                step = targets.get(position)
+                if step is not None:
+                    target_values[get_batch_step(step, block_start)['number']] = value
+        if block:
+            yield finish_block(block, target_values)
+    finally:
+        workbook.close()
 
-def cleanup_temp_file(filepath):
+def process_batch_block(block):
     """
-    Clean up temporary file after processing.
+    Process the steps of one batch job (one short) in order.
     
     Args:
-        filepath (str): Path to the temporary file to delete
+        block (list): (step, cell_value) pairs from iter_batch_blocks()
+    
+    Returns:
+        dict: Step number → True/False result
     """
-    try:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            print(f"🗑️ Cleaned up temporary file")
-    except Exception as e:
-        print(f"❌ Error cleaning up temporary file: {e}")
+    results = {}
+    if get_setting('BUNDLE_CELL_STEPS'):
+        results.update(run_bundled_cell_steps([step for step, _ in block if step['kind'] == 'excel'],
+                                              {step['source']: value for step, value in block}))
+    for step, value in block:
+        if step['number'] in results:
+            continue
+        try:
+            results[step['number']] = process_step(step, value)
+        except Exception as e:
+            print(f"❌ Step {step['number']} failed: {e}")
+            results[step['number']] = False
+    return results
 
-def create_temp_word_file(cell_name, content):
+def run_batch(max_workers, start_row, end_row=None, block_rows=None):
     """
-    Create temporary Word file with cell content, preserving formatting and newlines.
+    Run every short of the sheet (see iter_batch_blocks()) as an independent job.
     
-    This enhanced version splits content by newlines and creates separate paragraphs
-    to preserve the original structure and formatting.
+    Jobs are streamed from the workbook into a bounded worker pool: at most
+    twice `max_workers` jobs are queued at a time, so throughput scales with
+    concurrency while memory stays flat for long sheets.
     
     Args:
-        cell_name (str): Name of the cell (e.g., 'C11', 'C12')
-        content: Cell content to write to temporary Word file
+        max_workers (int): Number of jobs processed at the same time
+        start_row (int): First row of the first short
+        end_row (int): Last row to process (default: last row of the sheet)
+        block_rows (int): Rows per short (default: the rows used by WORKFLOW_STEPS)
     
     Returns:
-        str: Filepath of created temporary Word file or None if error occurs
+        dict: Step number → True/False result for every processed step
     """
+    block_rows = block_rows or get_workflow_rows()[1]
+    print(f"📦 Batch mode: one short per {block_rows} rows from row {start_row} to {end_row or 'the end'} "
+          f"({max_workers} workers)")
+    results = {}
+    shorts = 0
+    queue_slots = threading.BoundedSemaphore(max_workers * 2)
     try:
-        temp_filename = f"temp_{cell_name}.docx"
-        temp_filepath = os.path.join(os.path.dirname(EXCEL_FILE_PATH), temp_filename)
-        
-        # Create a new Word document
-        doc = Document()
-        # Ensure we write the actual cell value (not formula) to the Word file
-        cell_value = str(content) if content is not None else ""
-        
-        # Preserve line breaks and formatting by splitting on newlines
-        if '\n' in cell_value:
-            # Split content by newlines and add each as separate paragraph
-            lines = cell_value.split('\n')
-            for line in lines:
-                doc.add_paragraph(line)
-        else:
-            # Single paragraph for content without newlines
-            doc.add_paragraph(cell_value)
-        
-        doc.save(temp_filepath)
-        
-        print(f"📄 Created temporary Word file: {temp_filename} (preserving all content and formatting)")
-        return temp_filepath
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for block in iter_batch_blocks(start_row, end_row, block_rows):
+                # Wait for a free slot so unread rows stay in the workbook, not in memory
+                queue_slots.acquire()
+                future = executor.submit(process_batch_block, block)
+                future.add_done_callback(lambda _: queue_slots.release())
+                futures.append(future)
+                shorts += 1
+            for future in as_completed(futures):
+                results.update(future.result())
     except Exception as e:
-        print(f"❌ Error creating temporary Word file: {e}")
-        return None
+        print(f"❌ Error reading batch rows: {e}")
+    finally:
+        # Save all generated cells in one load/save cycle
+        excel_saved = flush_excel_writes()
+        flush_results()
+    if excel_saved:
+        save_state_index()
+    else:
+        results = {number: False if result in (True, STEP_REPLAYED) else result
+                   for number, result in results.items()}
+    
+    unchanged = sum(1 for result in results.values() if result == STEP_UNCHANGED)
+    succeeded = sum(1 for result in results.values() if result in (True, STEP_REPLAYED))
+    print(f"\n📋 Batch summary: {shorts} shorts, {len(results)} steps, {succeeded} succeeded, "
+          f"{len(results) - succeeded - unchanged} failed, {unchanged} unchanged (skipped)")
+    return results
 
-def read_temp_word_file(filepath):
+def print_cache_stats():
+    """Print the response cache hit/miss counters for this run."""
+    if get_setting('CACHE_ENABLED'):
+        print(f"💾 Response cache: {_cache_stats['hits']} hits, {_cache_stats['misses']} misses, "
+              f"{_cache_stats['writes']} writes, {_cache_stats['evictions']} evictions")
+
+def report_run(args):
     """
-    Read complete content from temporary Word file preserving all formatting and newlines.
-    
-    This enhanced version preserves the original document structure by reading all
-    paragraphs and tables, maintaining newlines and formatting.
+    Print the run statistics and write the requested run reports.
     
     Args:
-        filepath (str): Path to the temporary Word file
+        args (argparse.Namespace): Options from parse_args()
+    """
+    print_cache_stats()
+    report = build_run_report()
+    totals = report['totals']
+    phases = {}
+    for metrics in report['steps'].values():
+        for phase, seconds in metrics['phases'].items():
+            phases[phase] = phases.get(phase, 0.0) + seconds
+    phase_summary = ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in sorted(phases.items()))
+    print(f"⏱️ Run time: {report['duration']:.2f}s ({phase_summary or 'no phases recorded'})")
+    print(f"🔢 Tokens: {totals.get('prompt_tokens', 0)} prompt, {totals.get('completion_tokens', 0)} completion "
+          f"in {totals.get('api_calls', 0)} API calls ({totals.get('retries', 0)} retries)")
+    if args.report:
+        write_run_report(args.report, report)
+    if args.prometheus:
+        write_prometheus_textfile(args.prometheus, report)
+    write_profile_report()
+
+def time_imports():
+    """
+    Measure how long each heavy dependency takes to import (--timing-imports).
+    
+    Run this before anything else loads the modules, so the numbers reflect
+    a cold start. `python -X importtime YouTube.py --timing-imports` gives
+    the full per-module breakdown.
+    """
+    print("⏱️ Import timings (cold start):")
+    total = 0.0
+    for module_name in HEAVY_MODULES:
+        if module_name in sys.modules:
+            print(f"   {module_name:<10} already loaded")
+            continue
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"   {module_name:<10} ❌ not installed ({e})")
+            continue
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"   {module_name:<10} {elapsed * 1000:8.1f} ms")
+    print(f"   {'total':<10} {total * 1000:8.1f} ms")
+
+def check_config():
+    """
+    Print the effective configuration without loading the heavy dependencies (--check-config).
     
     Returns:
-        str: Complete file content with preserved formatting or None if error occurs
+        bool: True if the API key and the Excel file are available
     """
-    try:
-        doc = Document(filepath)
-        content = ""
-        
-        # Read all paragraphs and preserve original structure
-        for i, paragraph in enumerate(doc.paragraphs):
-            content += paragraph.text
-            # Add newline after each paragraph except the last one
-            if i < len(doc.paragraphs) - 1:
-                content += "\n"
-        
-        # Also check for any tables in the document
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    content += "\n" + cell.text
-        
-        print(f"📖 Read complete content from temporary Word file ({len(content)} characters)")
-        print(f"📝 Content preview (first 200 chars): {content[:200]}...")
-        
-        # Return the complete content without stripping to preserve all formatting
-        return content
-    except Exception as e:
-        print(f"❌ Error reading temporary Word file: {e}")
-        return None
+    load_environment()
+    api_key_set = os.getenv('OPENROUTER_API_KEY', 'your-api-key-here') != 'your-api-key-here'
+    excel_found = os.path.exists(EXCEL_FILE_PATH)
+    print("🔧 Configuration:")
+    print(f"   {'✅' if api_key_set else '❌'} OPENROUTER_API_KEY {'set' if api_key_set else 'missing'}")
+    print(f"   {'✅' if excel_found else '❌'} Excel file: {EXCEL_FILE_PATH} (sheet '{SHEET_NAME}')")
+    print(f"   API: {API_URL} (models {' → '.join(get_model_chain())})")
+    for name in DEFAULT_SETTINGS:
+        print(f"   {name} = {get_setting(name)!r}")
+    return api_key_set and excel_found
 
-def get_user_confirmation(message):
+def parse_args(argv=None):
     """
-    Get user confirmation before proceeding with the next step.
+    Parse command line options.
     
     Args:
-        message (str): Message to display to the user
+        argv (list): Arguments to parse (default: sys.argv[1:])
     
     Returns:
-        bool: True if user confirms (presses 'Y'), False otherwise
+        argparse.Namespace: Parsed options
     """
-    while True:
-        response = input(f"\n{message}\nPress 'Y' to continue, any other key to stop: ").strip()
-        if response.upper() == 'Y':
-            return True
-        else:
-            return False
+    parser = argparse.ArgumentParser(description="YouTube AI Chat Excel Automation")
+    parser.add_argument('-y', '--yes', action='store_true',
+                        help="run all steps without confirmation prompts")
+    parser.add_argument('--parallel', type=int, default=1, metavar='N',
+                        help="run up to N steps at the same time (implies --yes)")
+    parser.add_argument('--batch', action='store_true',
+                        help="process every short of the sheet: the C2 … C12 layout repeated every --block-rows rows "
+                             "(use --parallel N for N workers)")
+    parser.add_argument('--start-row', type=int, default=get_workflow_rows()[0], metavar='ROW',
+                        help=f"first row of the first short in batch mode and --export-results "
+                             f"(default: {get_workflow_rows()[0]})")
+    parser.add_argument('--end-row', type=int, default=None, metavar='ROW',
+                        help="last row processed in batch mode and --export-results (default: last row)")
+    parser.add_argument('--block-rows', type=int, default=get_workflow_rows()[1], metavar='N',
+                        help=f"rows per short in batch mode (default and minimum: {get_workflow_rows()[1]})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="do not read or write the AI response cache")
+    parser.add_argument('--refresh', action='store_true',
+                        help="ignore cached AI responses but store the new ones")
+    parser.add_argument('--debug-intermediates', action='store_true',
+                        help="save each step's input as temp_<cell>.txt/.docx next to the Excel file")
+    parser.add_argument('--stream', action='store_true',
+                        help="stream the text file responses (C11/C12) token by token into the output files")
+    parser.add_argument('--report', metavar='PATH',
+                        help="write a JSON run report (per-step timings, tokens, retries, cache hits)")
+    parser.add_argument('--prometheus', metavar='PATH',
+                        help="write the run metrics as a Prometheus textfile (.prom)")
+    parser.add_argument('--bundle', action='store_true',
+                        help="send the Excel cell steps as one JSON request (batch mode: one request per short)")
+    parser.add_argument('--force', action='store_true',
+                        help="process every step, even if its input is unchanged since the last run")
+    parser.add_argument('--deadline', type=float, default=None, metavar='SECONDS',
+                        help="time allowed for the whole run, split across the steps (default: RUN_DEADLINE, 0 = none)")
+    parser.add_argument('--resume', action='store_true',
+                        help="finish an interrupted run: replay finished steps from the run journal, run the rest")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and process changed cells whenever the Excel file is saved (implies --yes)")
+    parser.add_argument('--workbooks', metavar='FILE',
+                        help="process every workbook/sheet listed in this JSON file in parallel processes (implies --yes)")
+    parser.add_argument('--processes', type=int, default=0, metavar='N',
+                        help="worker processes for --workbooks (default: one per CPU core)")
+    parser.add_argument('--export-results', action='store_true',
+                        help="write the latest stored outputs back to the Excel cells and text files and exit")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="profile each step and the Excel/Word/API helpers; write .pstats files and an allocation summary to DIR")
+    parser.add_argument('--check-config', action='store_true',
+                        help="print the effective configuration and exit")
+    parser.add_argument('--timing-imports', action='store_true',
+                        help="print how long the heavy dependencies take to import and exit")
+    args = parser.parse_args(argv)
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+    if args.start_row < 1:
+        parser.error("--start-row must be at least 1")
+    if args.block_rows < get_workflow_rows()[1]:
+        parser.error(f"--block-rows must be at least {get_workflow_rows()[1]}, the rows used by one short")
+    if args.end_row is not None and args.end_row < args.start_row:
+        parser.error("--end-row must not be before --start-row")
+    if args.watch and args.workbooks:
+        parser.error("--watch cannot be combined with --workbooks")
+    if args.processes < 0:
+        parser.error("--processes must not be negative")
+    if args.watch or args.workbooks:
+        args.yes = True
+    return args
 
-def main():
+def run_workflow(args):
     """
-    Main automation workflow that processes Excel content through AI.
+    Run the workflow (or the batch) once and report it.
     
-    Workflow Steps:
-    1. Read Excel data from specified cells (C2, C3, C9, C10, C11, C12)
-    2. Process C2 → B4 (Excel cell via temporary text file)
-    3. Process C3 → B6 (Excel cell via temporary text file)
-    4. Process C9 → B9 (Excel cell via temporary text file)
-    5. Process C10 → B10 (Excel cell via temporary text file)
-    6. Process C11 → ShortEng_AT.txt (Text file via temporary Word file)
-    7. Process C12 → ShortHindi_AT.txt (Text file via temporary Word file)
+    Args:
+        args (argparse.Namespace): Options from parse_args()
     
-    Each step includes:
-    - User confirmation prompt
-    - Temporary file creation
-    - AI processing with enhanced prompts
-    - Response saving    - File cleanup
+    Returns:
+        dict: Step number → True/False result for every step that was run,
+        or None if the Excel data could not be read
     """
-    print("🚀 Starting YouTube AI Chat Excel Automation")
-    print("=" * 60)
+    reset_metrics()
+    
+    deadline = args.deadline if args.deadline is not None else get_setting('RUN_DEADLINE')
+    if args.batch:
+        start_run_deadline(deadline)
+        start_journal([], resume=args.resume)
+        try:
+            results = run_batch(args.parallel, args.start_row, args.end_row, args.block_rows)
+        finally:
+            close_journal()
+        report_run(args)
+        return results
     
     # ==========================================
     # STEP 1: Initialize - Read Excel Data
@@ -377,214 +3177,350 @@ def main():
     print("\n📋 Excel data loaded successfully!")
     
     # ==========================================
-    # STEP 2: Process C2 → B4 (Excel Cell)
-    # ==========================================
-    if excel_data['C2']:
-        print(f"\n🔄 STEP 1: Processing C2 content")
-        print(f"📝 Content preview: {str(excel_data['C2'])[:100]}...")
-        
-        # Create temporary file with C2 content
-        temp_file = create_temp_file("C2", excel_data['C2'])
-        if temp_file:
-            # Read content from temporary file
-            temp_content = read_temp_file(temp_file)
-            if temp_content:
-                # Generate AI response
-                prompt_c2 = f"Based on this content from the temporary file: '{temp_content}', generate an appropriate response for cell B4."
-                response_b4 = get_ai_response(prompt_c2)
-                
-                if response_b4:
-                    print(f"\n📝 AI Response for B4:\n{response_b4}")
-                    # Save to Excel B4
-                    write_to_excel('B4', response_b4)
-                    print("✅ Step 1 completed: C2 → B4")
-                else:
-                    print("❌ Failed to get AI response for B4")
-            
-            # Cleanup temporary file
-            cleanup_temp_file(temp_file)
-        
-        # User confirmation to continue
-        if not get_user_confirmation("🤔 Step 1 completed. Continue with script execution?"):
-            print("⏹️ Script execution stopped by user.")
-            return    
-    # ==========================================
-    # STEP 3: Process C3 → B6 (Excel Cell)
-    # ==========================================
-    if excel_data['C3']:
-        print(f"\n🔄 STEP 2: Processing C3 content")
-        print(f"📝 Content preview: {str(excel_data['C3'])[:100]}...")
-        
-        # Create temporary file with C3 content
-        temp_file = create_temp_file("C3", excel_data['C3'])
-        if temp_file:
-            # Read content from temporary file
-            temp_content = read_temp_file(temp_file)
-            if temp_content:
-                # Generate AI response
-                prompt_c3 = f"Based on this content from the temporary file: '{temp_content}', generate an appropriate response for cell B6."
-                response_b6 = get_ai_response(prompt_c3)
-                
-                if response_b6:
-                    print(f"\n📝 AI Response for B6:\n{response_b6}")
-                    # Save to Excel B6
-                    write_to_excel('B6', response_b6)
-                    print("✅ Step 2 completed: C3 → B6")
-                else:
-                    print("❌ Failed to get AI response for B6")
-            
-            # Cleanup temporary file
-            cleanup_temp_file(temp_file)
-        
-        # User confirmation to continue
-        if not get_user_confirmation("🤔 Step 2 completed. Continue with script execution?"):
-            print("⏹️ Script execution stopped by user.")
-            return    
-    # ==========================================
-    # STEP 4: Process C9 → B9 (Excel Cell)
-    # ==========================================
-    if excel_data['C9']:
-        print(f"\n🔄 STEP 3: Processing C9 content")
-        print(f"📝 Content preview: {str(excel_data['C9'])[:100]}...")
-        
-        # Create temporary file with C9 content
-        temp_file = create_temp_file("C9", excel_data['C9'])
-        if temp_file:
-            # Read content from temporary file
-            temp_content = read_temp_file(temp_file)
-            if temp_content:
-                # Generate AI response
-                prompt_c9 = f"Based on this content from the temporary file: '{temp_content}', generate an appropriate response for cell B9."
-                response_b9 = get_ai_response(prompt_c9)
-                
-                if response_b9:
-                    print(f"\n📝 AI Response for B9:\n{response_b9}")
-                    # Save to Excel B9
-                    write_to_excel('B9', response_b9)
-                    print("✅ Step 3 completed: C9 → B9")
-                else:
-                    print("❌ Failed to get AI response for B9")
-            
-            # Cleanup temporary file
-            cleanup_temp_file(temp_file)
-        
-        # User confirmation to continue
-        if not get_user_confirmation("🤔 Step 3 completed. Continue with script execution?"):
-            print("⏹️ Script execution stopped by user.")
-            return    
-    # ==========================================
-    # STEP 5: Process C10 → B10 (Excel Cell)
-    # ==========================================
-    if excel_data['C10']:
-        print(f"\n🔄 STEP 4: Processing C10 content")
-        print(f"📝 Content preview: {str(excel_data['C10'])[:100]}...")
-        
-        # Create temporary file with C10 content
-        temp_file = create_temp_file("C10", excel_data['C10'])
-        if temp_file:
-            # Read content from temporary file
-            temp_content = read_temp_file(temp_file)
-            if temp_content:
-                # Generate AI response
-                prompt_c10 = f"Based on this content from the temporary file: '{temp_content}', generate an appropriate response for cell B10."
-                response_b10 = get_ai_response(prompt_c10)
-                
-                if response_b10:
-                    print(f"\n📝 AI Response for B10:\n{response_b10}")
-                    # Save to Excel B10
-                    write_to_excel('B10', response_b10)
-                    print("✅ Step 4 completed: C10 → B10")
-                else:
-                    print("❌ Failed to get AI response for B10")
-            
-            # Cleanup temporary file
-            cleanup_temp_file(temp_file)
-        
-        # User confirmation to continue
-        if not get_user_confirmation("🤔 Step 4 completed. Continue with script execution?"):
-            print("⏹️ Script execution stopped by user.")
-            return    
-    # ==========================================
-    # STEP 6: Process C11 → ShortEng_AT.txt (Text File via Word)
-    # ==========================================
-    if excel_data['C11']:
-        print(f"\n🔄 STEP 5: Processing C11 content")
-        print(f"📝 Content preview: {str(excel_data['C11'])[:100]}...")
-        
-        # Create temporary Word file with C11 content
-        temp_word_file = create_temp_word_file("C11", excel_data['C11'])
-        if temp_word_file:            # Read content from temporary Word file
-            temp_content = read_temp_word_file(temp_word_file)
-            if temp_content:
-                # Generate AI response with complete content
-                prompt_c11 = f"""COMPLETE CONTENT from Word file (preserving all formatting and newlines):
-
-{temp_content}
-
-Based on the COMPLETE content above from the temporary Word file, generate an appropriate English short response for ShortEng_AT file. Please process the entire content including all lines, paragraphs, and formatting."""
-                response_c11 = get_ai_response(prompt_c11)
-                
-                if response_c11:
-                    print(f"\n📝 AI Response for ShortEng_AT:\n{response_c11}")
-                    # Save to ShortEng_AT text file
-                    write_to_text_file('ShortEng_AT', response_c11)
-                    print("✅ Step 5 completed: C11 → ShortEng_AT.txt (via temp Word file)")
-                else:
-                    print("❌ Failed to get AI response for ShortEng_AT")
-            
-            # Cleanup temporary Word file
-            cleanup_temp_file(temp_word_file)
-        
-        # User confirmation to continue
-        if not get_user_confirmation("🤔 Step 5 completed. Continue with script execution?"):
-            print("⏹️ Script execution stopped by user.")
-            return    
+    # STEPS 2-7: Process each non-empty source cell
     # ==========================================
-    # STEP 7: Process C12 → ShortHindi_AT.txt (Text File via Word)
-    # ==========================================
-    if excel_data['C12']:
-        print(f"\n🔄 STEP 6: Processing C12 content")
-        print(f"📝 Content preview: {str(excel_data['C12'])[:100]}...")
-        
-        # Create temporary Word file with C12 content
-        temp_word_file = create_temp_word_file("C12", excel_data['C12'])
-        if temp_word_file:            # Read content from temporary Word file
-            temp_content = read_temp_word_file(temp_word_file)
-            if temp_content:
-                # Generate AI response with complete content
-                prompt_c12 = f"""COMPLETE CONTENT from Word file (preserving all formatting and newlines):
-
-{temp_content}
-
-Based on the COMPLETE content above from the temporary Word file, generate an appropriate Hindi short response for ShortHindi_AT file. Please process the entire content including all lines, paragraphs, and formatting."""
-                response_c12 = get_ai_response(prompt_c12)
-                
-                if response_c12:
-                    print(f"\n📝 AI Response for ShortHindi_AT:\n{response_c12}")
-                    # Save to ShortHindi_AT text file
-                    write_to_text_file('ShortHindi_AT', response_c12)
-                    print("✅ Step 6 completed: C12 → ShortHindi_AT.txt (via temp Word file)")
-                else:
-                    print("❌ Failed to get AI response for ShortHindi_AT")
-            
-            # Cleanup temporary Word file
-            cleanup_temp_file(temp_word_file)    
+    steps = [dict(step, target_value=excel_data[step['target']]) if step['kind'] == 'excel' else step
+             for step in WORKFLOW_STEPS if excel_data[step['source']]]
+    start_run_deadline(deadline, len(steps), args.parallel)
+    start_journal(steps, resume=args.resume)
+    results = {}
+    try:
+        if get_setting('BUNDLE_CELL_STEPS'):
+            results = run_bundled_cell_steps([step for step in steps if step['kind'] == 'excel'], excel_data)
+        remaining_steps = [step for step in steps if step['number'] not in results]
+        if args.parallel > 1:
+            results.update(run_steps_parallel(remaining_steps, excel_data, args.parallel))
+        else:
+            results.update(run_steps_sequential(remaining_steps, excel_data, confirm=not args.yes))
+    finally:
+        # Save all queued Excel cells in one load/save cycle
+        excel_saved = flush_excel_writes()
+        flush_results()
+        close_journal()
+    if excel_saved:
+        save_state_index()
+    else:
+        for step in steps:
+            if step['kind'] == 'excel' and results.get(step['number']) in (True, STEP_REPLAYED):
+                results[step['number']] = False
+    skipped = [step['source'] for step in steps if results.get(step['number']) == STEP_UNCHANGED]
+    if skipped:
+        print(f"\n⏩ Skipped {len(skipped)} unchanged step(s): {', '.join(skipped)} (use --force to re-run)")
+    
     # ==========================================
     # WORKFLOW COMPLETION SUMMARY
     # ==========================================
-    print("\n🎉 Excel automation workflow completed successfully!")
+    print("\n🎉 Excel automation workflow completed!")
+    print("=" * 60)
+    print("📋 Summary of actions:")
+    for step in WORKFLOW_STEPS:
+        target = step['target'] if step['kind'] == 'excel' else f"{step['target']}.txt"
+        description = "Excel cell" if step['kind'] == 'excel' else "Text file"
+        result = results.get(step['number'])
+        status = {True: "✅", False: "❌", STEP_UNCHANGED: "♻️", STEP_REPLAYED: "🔁"}.get(result, "⏭️")
+        print(f"   {status} Step {step['number']}: {step['source']} → {target} ({description})")
     print("=" * 60)
-    print("📋 Summary of completed actions:")
-    print("   ✅ Step 1: C2 → B4 (Excel cell)")
-    print("   ✅ Step 2: C3 → B6 (Excel cell)")
-    print("   ✅ Step 3: C9 → B9 (Excel cell)")
-    print("   ✅ Step 4: C10 → B10 (Excel cell)")
-    print("   ✅ Step 5: C11 → ShortEng_AT.txt (Text file via temp Word file)")
-    print("   ✅ Step 6: C12 → ShortHindi_AT.txt (Text file via temp Word file)")
+    report_run(args)
+    return results
+
+def watch_workbook(args):
+    """
+    Keep running the workflow whenever the Excel file changes (--watch).
+    
+    The file's modification time and size are polled every WATCH_INTERVAL
+    seconds; after a change, the run starts once the file has been stable
+    for WATCH_DEBOUNCE seconds, so a save in progress is not read half
+    written. Incremental runs make each pass process only the cells that
+    changed, and the HTTP session, response cache, rate limiters and parsed
+    workbook snapshots stay warm between passes. The file written by our
+    own Excel flush does not trigger another pass, but a save made by
+    someone else while a pass is running does.
+    
+    Args:
+        args (argparse.Namespace): Options from parse_args()
+    
+    Returns:
+        dict: Results of the last pass
+    """
+    interval, debounce = get_setting('WATCH_INTERVAL'), get_setting('WATCH_DEBOUNCE')
+    
+    def run_pass(fingerprint):
+        # Returns the pass results and the fingerprint of the file as it is
+        # now fully processed: the one our last flush saved if every flush
+        # started from the file the pass read (or from our previous save),
+        # otherwise the one the pass read, so a change made during the pass
+        # is picked up by the next poll
+        with _excel_lock:
+            _excel_saves.update(first_loaded=None, last_saved=None, external=False)
+        pass_results = run_workflow(args)
+        with _excel_lock:
+            if (_excel_saves['first_loaded'] == fingerprint
+                    and not _excel_saves['external']):
+                return pass_results, _excel_saves['last_saved']
+        return pass_results, fingerprint
+    
+    results, last_processed = run_pass(get_workbook_fingerprint())
+    # Only the first pass resumes an interrupted run or ignores the
+    # incremental state (--force/--refresh)
+    args = argparse.Namespace(**dict(vars(args), resume=False))
+    if args.force or args.refresh:
+        _setting_overrides.pop('INCREMENTAL', None)
+        _setting_overrides.pop('CACHE_REFRESH', None)
+    print(f"\n👀 Watching {EXCEL_FILE_PATH} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            try:
+                fingerprint = get_workbook_fingerprint()
+            except OSError:
+                continue  # The file is being replaced by a save
+            if fingerprint == last_processed:
+                continue
+            
+            # Wait until the file stops changing
+            stable_since = time.monotonic()
+            while time.monotonic() - stable_since < debounce:
+                time.sleep(min(interval, debounce))
+                try:
+                    current = get_workbook_fingerprint()
+                except OSError:
+                    current = None
+                if current != fingerprint:
+                    fingerprint, stable_since = current, time.monotonic()
+            if fingerprint is None:
+                continue
+            
+            print(f"\n🔔 {os.path.basename(EXCEL_FILE_PATH)} changed at {datetime.now():%H:%M:%S}")
+            results, last_processed = run_pass(fingerprint)
+            print(f"\n👀 Watching {EXCEL_FILE_PATH} for changes (Ctrl+C to stop)")
+    except KeyboardInterrupt:
+        print("\n👋 Watch mode stopped")
+    return results
+
+def load_workbook_configs(path):
+    """
+    Read the list of workbooks for --workbooks.
+    
+    The file holds a JSON list whose entries are either a workbook path or
+    an object such as {"excel_file": "Channel2/YouTubeVideosList.xlsx",
+    "sheet": "Shorts_Automation"}; relative paths are resolved from the
+    list's folder and the sheet defaults to SHEET_NAME.
+    
+    Args:
+        path (str): Path of the JSON file
+    
+    Returns:
+        list: Dicts with 'excel_file' and 'sheet'
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    configs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'excel_file': entry}
+        configs.append({
+            'excel_file': os.path.join(base_dir, entry['excel_file']),
+            'sheet': entry.get('sheet', SHEET_NAME),
+        })
+    return configs
+
+def _get_shard_path(path, index):
+    """Per-workbook variant of a report path: report.json → report.<index>.json."""
+    if not path:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{index}{extension}"
+
+def reset_workbook_state():
+    """
+    Forget everything kept for the current workbook: queued Excel updates and
+    results, cell snapshots, the state index, the run journal and the rate
+    limiters. Worker processes call this before moving on to another
+    workbook or sheet, so nothing left over (e.g. updates queued after a failed save)
+    ends up in the next one.
+    """
+    close_journal()
+    with _journal_lock:
+        _journal['states'] = {}
+    with _excel_lock:
+        _pending_excel_writes.clear()
+        _excel_saves.update(first_loaded=None, last_saved=None, external=False)
+    with _results_lock:
+        _pending_results.clear()
+    with _snapshot_lock:
+        _workbook_snapshots.clear()
+    with _state_lock:
+        _state_index.update(entries={}, loaded_from=None, dirty=False)
+    with _rate_limit_condition:
+        _rate_limiters.clear()
+
+def run_shard(configs, args, setting_overrides):
+    """
+    Run the workflow for one workbook in a worker process of --workbooks.
+    
+    All listed sheets of the workbook are processed one after another in
+    this process, so their saves never overwrite each other. Before each
+    sheet the worker resets the state of the previous one (see
+    reset_workbook_state()), points EXCEL_FILE_PATH and SHEET_NAME at it,
+    applies the settings of the parent process and writes its console output
+    to <workbook name>[.<sheet>].run.log next to the workbook.
+    
+    Args:
+        configs (list): (index, config) pairs of the workbook's sheets, where
+            config has 'excel_file' and 'sheet' and index is the position in
+            the list (for report paths)
+        args (argparse.Namespace): Options from parse_args()
+        setting_overrides (dict): Settings to apply with set_setting()
+    
+    Returns:
+        list: (config, step results from run_workflow(), log file path) per sheet
+    """
+    global EXCEL_FILE_PATH, SHEET_NAME
+    shard_results = []
+    for index, config in configs:
+        # Worker processes are reused for several workbooks and sheets
+        reset_workbook_state()
+        EXCEL_FILE_PATH, SHEET_NAME = config['excel_file'], config['sheet']
+        for name, value in setting_overrides.items():
+            set_setting(name, value)
+        with _cache_lock:
+            for event in _cache_stats:
+                _cache_stats[event] = 0
+        shard_args = argparse.Namespace(**dict(vars(args), workbooks=None,
+                                               report=_get_shard_path(args.report, index),
+                                               prometheus=_get_shard_path(args.prometheus, index)))
+        if args.profile:
+            start_profiling(os.path.join(args.profile, str(index)))
+        log_path = get_sheet_file_path('.run.log')
+        with open(log_path, 'w', encoding='utf-8') as log_file, redirect_stdout(log_file):
+            results = run_workflow(shard_args)
+        shard_results.append((config, results, log_path))
+    return shard_results
+
+def run_workbook_shards(args):
+    """
+    Process several workbooks in parallel worker processes (--workbooks).
+    
+    Each process reads and saves its own workbook, so openpyxl parsing and
+    saving use several cores; several sheets of the same workbook are
+    handled by the same process. The processes share one response cache
+    directory (next to the list file unless CACHE_DIR is set), and the
+    per-model RPM/TPM budgets are split evenly between the processes running
+    at the same time, so together they stay within the API limits.
+    
+    Args:
+        args (argparse.Namespace): Options from parse_args()
+    
+    Returns:
+        dict: '<workbook>!<sheet>' → step results of that workbook
+        (None if it could not be processed)
+    """
+    configs = load_workbook_configs(args.workbooks)
+    if not configs:
+        print(f"⚠️ No workbooks listed in {args.workbooks}")
+        return {}
+    shards = {}
+    for index, config in enumerate(configs, 1):
+        shards.setdefault(os.path.normcase(os.path.abspath(config['excel_file'])), []).append((index, config))
+    processes = min(args.processes or os.cpu_count() or 1, len(shards))
+    setting_overrides = dict(_setting_overrides, RATE_LIMIT_SHARE=get_setting('RATE_LIMIT_SHARE') / processes)
+    if not get_setting('CACHE_DIR'):
+        setting_overrides['CACHE_DIR'] = os.path.join(os.path.dirname(os.path.abspath(args.workbooks)), '.ai_cache')
+    print(f"📚 Processing {len(configs)} sheets of {len(shards)} workbooks in {processes} processes")
+    
+    all_results = {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(run_shard, shard, args, setting_overrides): shard
+                   for shard in shards.values()}
+        for future in as_completed(futures):
+            try:
+                shard_results = future.result()
+            except Exception as e:
+                for _, config in futures[future]:
+                    label = f"{config['excel_file']}!{config['sheet']}"
+                    print(f"❌ {label} failed: {e}")
+                    all_results[label] = None
+                continue
+            for config, results, log_path in shard_results:
+                label = f"{config['excel_file']}!{config['sheet']}"
+                all_results[label] = results
+                if results is None:
+                    print(f"❌ {label}: could not read the Excel data (see {log_path})")
+                    continue
+                succeeded = sum(1 for result in results.values() if result in (True, STEP_REPLAYED))
+                unchanged = sum(1 for result in results.values() if result == STEP_UNCHANGED)
+                print(f"{'✅' if succeeded + unchanged == len(results) else '❌'} {label}: {succeeded} succeeded, "
+                      f"{len(results) - succeeded - unchanged} failed, {unchanged} unchanged (log: {log_path})")
+    return all_results
+
+def main(args=None):
+    """
+    Main automation workflow that processes Excel content through AI.
+    
+    Workflow Steps:
+    1. Read Excel data from specified cells (C2, C3, C9, C10, C11, C12)
+    2. Process C2 → B4 (Excel cell)
+    3. Process C3 → B6 (Excel cell)
+    4. Process C9 → B9 (Excel cell)
+    5. Process C10 → B10 (Excel cell)
+    6. Process C11 → ShortEng_AT.txt (Text file)
+    7. Process C12 → ShortHindi_AT.txt (Text file)
+    
+    Each step includes:
+    - User confirmation prompt (skipped with --yes or --parallel)
+    - AI processing of the cell content with enhanced prompts (in memory)
+    - Response saving
+    - Optional dump of the step input (--debug-intermediates)
+    
+    With --watch the workflow is run again whenever the Excel file changes;
+    with --workbooks it runs for several workbooks in parallel processes.
+    
+    Args:
+        args (argparse.Namespace): Options from parse_args() (default: interactive run)
+    
+    Returns:
+        dict: Step number → True/False result for every step that was run
+        (in watch mode: the last pass; with --workbooks: the results of each
+        workbook), or None if the Excel data could not be read
+    """
+    if args is None:
+        args = parse_args([])
+    if args.timing_imports:
+        time_imports()
+        return None
+    if args.check_config:
+        check_config()
+        return None
+    if args.no_cache:
+        set_setting('CACHE_ENABLED', False)
+    if args.refresh:
+        set_setting('CACHE_REFRESH', True)
+    if args.force or args.refresh:
+        set_setting('INCREMENTAL', False)
+    if args.debug_intermediates:
+        set_setting('DEBUG_INTERMEDIATES', True)
+    if args.stream:
+        set_setting('API_STREAM', True)
+    if args.bundle:
+        set_setting('BUNDLE_CELL_STEPS', True)
+    if args.profile and not args.workbooks:
+        start_profiling(args.profile)
+    
+    if args.export_results:
+        export_results((args.start_row, args.end_row))
+        return None
+    
+    print("🚀 Starting YouTube AI Chat Excel Automation")
     print("=" * 60)
+    if args.workbooks:
+        return run_workbook_shards(args)
+    if args.watch:
+        return watch_workbook(args)
+    return run_workflow(args)
 
 # ==========================================
 # SCRIPT EXECUTION ENTRY POINT
 # ==========================================
 if __name__ == "__main__":
-    main()
+    main(parse_args())
@@ -0,0 +1,417 @@
+"""
+YouTube AI Chat Excel Automation - Offline Benchmark
+====================================================
+
+This script measures the throughput of the YouTube.py workflow without spending
+real API quota. It starts a local stand-in for the OpenRouter
+/api/v1/chat/completions endpoint, generates synthetic Shorts_Automation
+workbooks and times main() end to end.
+
+Features:
+- Mock OpenRouter server with configurable latency, jitter, error rate and
+  streaming (server-sent events) behavior
+- Synthetic workbooks with N shorts in the WORKFLOW_STEPS layout (C2, C3,
+  C9-C12, repeated every 11 rows for batch mode)
+- Sequential (--yes), parallel (--parallel N) and batch (--batch) scenarios
+- Runs/sec, steps/sec, p50/p95 run latency and peak RSS per scenario
+- Each scenario runs in its own process so peak RSS is not shared
+- Seeded random data and error injection so results can be compared
+
+Usage:
+    python benchmark.py --runs 5 --latency 0.2 --error-rate 0.05 --shorts 5
+    python benchmark.py --scenarios batch --shorts 50 --workers 16 --json results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import queue
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+SCENARIOS = ('sequential', 'parallel', 'batch')
+
+# Words used for synthetic cell content and mock completions
+WORDS = ("video", "python", "excel", "automation", "shorts", "tutorial", "tips", "career",
+         "interview", "cloud", "data", "security", "agile", "testing", "youtube", "growth")
+
+def random_text(rng, words):
+    """
+    Build a random sentence from the benchmark word list.
+    
+    Args:
+        rng (random.Random): Seeded random generator
+        words (int): Number of words
+    
+    Returns:
+        str: Generated text
+    """
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def make_mock_handler(config):
+    """
+    Create the request handler class of the mock OpenRouter server.
+    
+    Args:
+        config (dict): Mock behavior: latency, jitter, error_rate, chunk_delay, seed
+    
+    Returns:
+        type: BaseHTTPRequestHandler subclass
+    """
+    rng = random.Random(config['seed'])
+    rng_lock = threading.Lock()
+    
+    class MockOpenRouterHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not self.path.endswith('/chat/completions'):
+                self.send_json(404, {'error': {'message': 'Not found'}})
+                return
+            
+            with rng_lock:
+                failed = rng.random() < config['error_rate']
+                status = rng.choice((429, 500, 503)) if failed else 200
+                delay = max(0.0, config['latency'] + rng.uniform(-config['jitter'], config['jitter']))
+                completion = random_text(rng, config['completion_words'])
+            if failed:
+                self.send_json(status, {'error': {'code': status, 'message': 'Injected error'}},
+                               headers={'Retry-After': '0'} if status == 429 else None)
+                return
+            
+            time.sleep(delay)
+            prompt = request.get('messages', [{}])[-1].get('content', '')
+            usage = {
+                'prompt_tokens': len(prompt) // 4 + 1,
+                'completion_tokens': len(completion) // 4 + 1,
+            }
+            usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+            
+            if request.get('stream'):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.wfile.write(b": OPENROUTER PROCESSING\n\n")
+                for word in completion.split(' '):
+                    event = {'choices': [{'delta': {'content': word + ' '}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                    time.sleep(config['chunk_delay'])
+                final_event = {'choices': [{'delta': {}, 'finish_reason': 'stop'}], 'usage': usage}
+                self.wfile.write(f"data: {json.dumps(final_event)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+                self.close_connection = True
+                return
+            
+            self.send_json(200, {
+                'id': 'mock-completion',
+                'model': request.get('model'),
+                'choices': [{'message': {'role': 'assistant', 'content': completion}, 'finish_reason': 'stop'}],
+                'usage': usage,
+            })
+    
+    return MockOpenRouterHandler
+
+def start_mock_server(config):
+    """
+    Start the mock OpenRouter server on a free local port.
+    
+    Args:
+        config (dict): Mock behavior (see make_mock_handler())
+    
+    Returns:
+        tuple: (server, chat completions URL)
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_mock_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/api/v1/chat/completions"
+
+def make_workbook(filepath, sheet_name, shorts, seed):
+    """
+    Create a synthetic Shorts_Automation workbook.
+    
+    Every short is laid out like YouTube.WORKFLOW_STEPS (a sentence in C2,
+    C3, C9 and C10, a multi-paragraph script in C11 and C12) and the next
+    short starts one block of rows further down, as batch mode expects. The
+    sequential and parallel scenarios process the first short.
+    
+    Args:
+        filepath (str): Workbook path
+        sheet_name (str): Name of the automation sheet
+        shorts (int): Number of shorts
+        seed (int): Random seed for the cell content
+    """
+    from openpyxl import Workbook
+    import YouTube
+    
+    rng = random.Random(seed)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = sheet_name
+    first_row, block_rows = YouTube.get_workflow_rows()
+    for short in range(shorts):
+        for step in YouTube.WORKFLOW_STEPS:
+            cell = YouTube.get_batch_step(step, first_row + short * block_rows)['source']
+            if step['kind'] == 'excel':
+                sheet[cell] = random_text(rng, 12)
+            else:
+                sheet[cell] = '\n'.join(random_text(rng, 15) for _ in range(20))
+    workbook.create_sheet('VideosList')['A1'] = "Other tracking data"
+    workbook.save(filepath)
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a list of values.
+    
+    Args:
+        values (list): Measured values
+        fraction (float): Percentile as a fraction (0.5 for p50)
+    
+    Returns:
+        float: Percentile value (0.0 for an empty list)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(len(ordered) - 1, max(0, rank - 1))]
+
+def get_peak_rss_mb():
+    """
+    Peak resident set size of the current process.
+    
+    Returns:
+        float: Peak RSS in MB, or None where the resource module is unavailable
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_scenario(scenario, options, api_url, result_queue):
+    """
+    Time one scenario in the current (child) process and report its statistics.
+    
+    Args:
+        scenario (str): 'sequential', 'parallel' or 'batch'
+        options (dict): Benchmark options from parse_args()
+        api_url (str): URL of the mock chat completions endpoint
+        result_queue (multiprocessing.Queue): Receives the result dict
+    """
+    os.environ['OPENROUTER_API_KEY'] = 'benchmark-key'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import YouTube
+    
+    YouTube.API_URL = api_url
+    YouTube.set_setting('CACHE_ENABLED', False)
+    YouTube.set_setting('INCREMENTAL', False)
+    YouTube.set_setting('API_RPM', 0)
+    YouTube.set_setting('API_TPM', 0)
+    YouTube.set_setting('API_MAX_CONCURRENCY', options['workers'])
+    YouTube.set_setting('API_BACKOFF_BASE', 0.05)
+    YouTube.set_setting('API_STREAM', options['stream'])
+    
+    argv = ['--yes']
+    if scenario == 'parallel':
+        argv += ['--parallel', str(options['workers'])]
+    elif scenario == 'batch':
+        first_row, block_rows = YouTube.get_workflow_rows()
+        argv += ['--batch', '--parallel', str(options['workers']),
+                 '--end-row', str(first_row + options['shorts'] * block_rows - 1)]
+    args = YouTube.parse_args(argv)
+    
+    durations, steps, failures, retries = [], 0, 0, 0
+    with tempfile.TemporaryDirectory(prefix='yt_bench_') as work_dir:
+        for run in range(options['warmup'] + options['runs']):
+            YouTube.EXCEL_FILE_PATH = os.path.join(work_dir, f"run_{run}.xlsx")
+            make_workbook(YouTube.EXCEL_FILE_PATH, YouTube.SHEET_NAME, options['shorts'], options['seed'] + run)
+            
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                step_results = YouTube.main(args) or {}
+            elapsed = time.perf_counter() - start
+            if run < options['warmup']:
+                continue
+            
+            durations.append(elapsed)
+            steps += len(step_results)
+            failures += sum(1 for result in step_results.values() if not result)
+            retries += YouTube.build_run_report()['totals'].get('retries', 0)
+    
+    total = sum(durations)
+    result_queue.put({
+        'scenario': scenario,
+        'runs': len(durations),
+        'total_seconds': round(total, 4),
+        'runs_per_second': round(len(durations) / total, 3) if total else 0.0,
+        'steps_per_second': round(steps / total, 3) if total else 0.0,
+        'p50_seconds': round(percentile(durations, 0.50), 4),
+        'p95_seconds': round(percentile(durations, 0.95), 4),
+        'mean_seconds': round(statistics.mean(durations), 4) if durations else 0.0,
+        'steps': steps,
+        'failed_steps': failures,
+        'retries': retries,
+        'peak_rss_mb': round(get_peak_rss_mb(), 1) if resource else None,
+    })
+
+def wait_for_result(process, result_queue, poll_interval=1.0):
+    """
+    Wait for a scenario's result without hanging if its process dies.
+    
+    Args:
+        process (multiprocessing.Process): Process running run_scenario()
+        result_queue (multiprocessing.Queue): Queue the result is put on
+        poll_interval (float): Seconds between checks of the process
+    
+    Returns:
+        dict: Result dict, or None if the process exited without one
+    """
+    while True:
+        try:
+            return result_queue.get(timeout=poll_interval)
+        except queue.Empty:
+            if not process.is_alive():
+                break
+    # The result may still be in transit when the process has just exited
+    try:
+        return result_queue.get(timeout=poll_interval)
+    except queue.Empty:
+        return None
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv (list): Arguments to parse (default: sys.argv[1:])
+    
+    Returns:
+        argparse.Namespace: Parsed options
+    """
+    parser = argparse.ArgumentParser(description="Offline benchmark for YouTube.py with a mock OpenRouter server")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument('--runs', type=int, default=5, help="measured runs per scenario (default: 5)")
+    parser.add_argument('--warmup', type=int, default=1, help="unmeasured warm-up runs per scenario (default: 1)")
+    parser.add_argument('--shorts', type=int, default=5,
+                        help="shorts in the synthetic workbook; batch runs all of them, the other "
+                             "scenarios the first (default: 5)")
+    parser.add_argument('--workers', type=int, default=6, help="--parallel value for parallel/batch (default: 6)")
+    parser.add_argument('--latency', type=float, default=0.2, help="mock response latency in seconds (default: 0.2)")
+    parser.add_argument('--jitter', type=float, default=0.05, help="± random latency jitter in seconds (default: 0.05)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="fraction of requests answered with 429/500/503 (default: 0)")
+    parser.add_argument('--stream', action='store_true', help="run the text file steps with --stream")
+    parser.add_argument('--chunk-delay', type=float, default=0.005,
+                        help="delay between streamed tokens in seconds (default: 0.005)")
+    parser.add_argument('--completion-words', type=int, default=60,
+                        help="words per mock completion (default: 60)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument('--json', metavar='PATH', help="also write the results as JSON")
+    args = parser.parse_args(argv)
+    if args.runs < 1 or args.shorts < 1 or args.workers < 1 or args.warmup < 0:
+        parser.error("--runs, --shorts and --workers must be at least 1 and --warmup at least 0")
+    if not 0.0 <= args.error_rate < 1.0:
+        parser.error("--error-rate must be between 0 and 1")
+    return args
+
+def main(args=None):
+    """
+    Run the selected benchmark scenarios against a mock OpenRouter server.
+    
+    Args:
+        args (argparse.Namespace): Options from parse_args() (default: sys.argv)
+    
+    Returns:
+        list: Result dict per scenario
+    """
+    if args is None:
+        args = parse_args()
+    options = vars(args)
+    mock_config = {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'chunk_delay': args.chunk_delay,
+        'completion_words': args.completion_words,
+        'seed': args.seed,
+    }
+    server, api_url = start_mock_server(mock_config)
+    print(f"🧪 Mock OpenRouter server: {api_url}")
+    print(f"   latency {args.latency}s ±{args.jitter}s, error rate {args.error_rate:.0%}, "
+          f"streaming {'on' if args.stream else 'off'}, {args.shorts} shorts, seed {args.seed}")
+    
+    results = []
+    context = multiprocessing.get_context('spawn')
+    try:
+        for scenario in args.scenarios:
+            print(f"\n⏱️ Running {scenario} scenario ({args.warmup} warm-up + {args.runs} runs)...")
+            result_queue = context.Queue()
+            process = context.Process(target=run_scenario, args=(scenario, options, api_url, result_queue))
+            process.start()
+            result = wait_for_result(process, result_queue)
+            process.join()
+            if result is None:
+                print(f"❌ {scenario} scenario failed (exit code {process.exitcode})")
+                result = {'scenario': scenario, 'error': f"exit code {process.exitcode}"}
+            results.append(result)
+    finally:
+        server.shutdown()
+    
+    print("\n📊 Benchmark results")
+    print("=" * 100)
+    print(f"{'scenario':<12}{'runs/s':>9}{'steps/s':>10}{'p50 s':>10}{'p95 s':>10}{'mean s':>10}"
+          f"{'steps':>8}{'failed':>7}{'retries':>8}{'peak RSS MB':>14}")
+    for result in results:
+        if 'error' in result:
+            print(f"{result['scenario']:<12}failed ({result['error']})")
+            continue
+        rss = f"{result['peak_rss_mb']:.1f}" if result['peak_rss_mb'] is not None else "n/a"
+        print(f"{result['scenario']:<12}{result['runs_per_second']:>9.3f}{result['steps_per_second']:>10.2f}"
+              f"{result['p50_seconds']:>10.3f}{result['p95_seconds']:>10.3f}{result['mean_seconds']:>10.3f}"
+              f"{result['steps']:>8}{result['failed_steps']:>7}{result['retries']:>8}{rss:>14}")
+    print("=" * 100)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'options': options, 'results': results}, f, indent=2)
+        print(f"✅ Results written to {args.json}")
+    return results
+
+# ==========================================
+# SCRIPT EXECUTION ENTRY POINT
+# ==========================================
+if __name__ == "__main__":
+    main(parse_args())